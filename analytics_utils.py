@@ -1,22 +1,83 @@
 #!/usr/bin/env python3
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime, timedelta
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 import gspread
 from google.oauth2.service_account import Credentials
+from google.auth.transport.requests import AuthorizedSession
+from requests.adapters import HTTPAdapter
 import json
 import os
+import hashlib
+import heapq
+import html
+import math
+import pickle
+import re
 from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
-# Configurazione stile grafici
-plt.style.use('default')
-sns.set_palette("husl")
-plt.rcParams['figure.facecolor'] = 'white'
-plt.rcParams['axes.facecolor'] = 'white'
+# Palette grafici SVG (campioni delle colormap viridis, Set3, Pastel1 e Set2)
+_VIRIDIS = ['#440154', '#482878', '#3e4989', '#31688e', '#26828e',
+            '#1f9e89', '#35b779', '#6ece58', '#b5de2b', '#fde725']
+_SET3 = ['#8dd3c7', '#ffffb3', '#bebada', '#fb8072', '#80b1d3', '#fdb462',
+         '#b3de69', '#fccde5', '#d9d9d9', '#bc80bd', '#ccebc5', '#ffed6f']
+_PASTEL1 = ['#fbb4ae', '#b3cde3', '#ccebc5', '#decbe4', '#fed9a6',
+            '#ffffcc', '#e5d8bd', '#fddaec', '#f2f2f2']
+_SET2 = ['#66c2a5', '#fc8d62', '#8da0cb', '#e78ac3', '#a6d854',
+         '#ffd92f', '#e5c494', '#b3b3b3']
+
+# Colonne derivate ad uso interno, escluse dagli export
+INTERNAL_COLUMNS = ['_completed']
+
+# Regex compilate una sola volta a livello di modulo
+_COMPLETED_RE = re.compile(r'sì|si|yes|true', re.IGNORECASE)
+_STAGE_PATTERNS = [
+    re.compile(r'page_opened|started|form_started'),
+    re.compile(r'form_started'),
+    re.compile(r'step2_completed'),
+    re.compile(r'step3_completed'),
+    re.compile(r'fully_completed')
+]
+
+# Colonne a bassa cardinalità convertite in category dopo il caricamento
+CATEGORICAL_COLUMNS = ['Stato', 'Completato', 'Dove Trovato QR', 'Fascia Età', 'Sesso', 'Titolo Studio']
+
+# Cache locale dei dati scaricati e delle metriche calcolate
+CACHE_DIR = Path('.cache')
+
+# Client gspread autorizzati, riutilizzati tra le chiamate (chiave: impronta delle credenziali)
+_CLIENTS = {}
+
+# Impronta del codice analytics: invalida le metriche in cache se il calcolo cambia
+_MODULE_DIGEST = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=8).hexdigest()
+
+
+def _authorized_client(creds_fingerprint, load_credentials):
+    """
+    Restituisce un client gspread con sessione HTTP persistente, creandolo una sola volta
+    
+    Args:
+        creds_fingerprint (str): Impronta delle credenziali, usata come chiave di cache
+        load_credentials (callable): Funzione che carica le Credentials se il client non esiste
+        
+    Returns:
+        gspread.Client: Client autorizzato
+    """
+    client = _CLIENTS.get(creds_fingerprint)
+    if client is None:
+        creds = load_credentials()
+        
+        # Pool di connessioni urllib3 condiviso da tutte le chiamate API
+        session = AuthorizedSession(creds)
+        session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=10))
+        
+        client = gspread.Client(auth=creds, session=session)
+        _CLIENTS[creds_fingerprint] = client
+    return client
 
 
 def setup_google_sheets_connection():
@@ -35,17 +96,24 @@ def setup_google_sheets_connection():
         # Cerca credenziali in diversi modi
         if os.getenv('GOOGLE_CREDENTIALS_JSON'):
             # GitHub Actions
-            creds_dict = json.loads(os.getenv('GOOGLE_CREDENTIALS_JSON'))
-            creds = Credentials.from_service_account_info(creds_dict, scopes=scope)
+            creds_json = os.getenv('GOOGLE_CREDENTIALS_JSON')
+            creds_fingerprint = 'env_' + hashlib.blake2b(creds_json.encode('utf-8'), digest_size=8).hexdigest()
+            client = _authorized_client(
+                creds_fingerprint,
+                lambda: Credentials.from_service_account_info(json.loads(creds_json), scopes=scope)
+            )
             print("Credenziali caricate da GitHub Actions")
         elif os.path.exists('credentials.json'):
             # Sviluppo locale
-            creds = Credentials.from_service_account_file('credentials.json', scopes=scope)
+            creds_fingerprint = f"file_{os.path.abspath('credentials.json')}_{os.path.getmtime('credentials.json')}"
+            client = _authorized_client(
+                creds_fingerprint,
+                lambda: Credentials.from_service_account_file('credentials.json', scopes=scope)
+            )
             print("Credenziali caricate da file locale")
         else:
             raise Exception("❌ Credenziali Google non trovate")
             
-        client = gspread.authorize(creds)
         sheet_id = os.getenv('GOOGLE_SHEET_ID', 'DEFAULT_SHEET_ID')
         
         if sheet_id == 'DEFAULT_SHEET_ID':
@@ -61,6 +129,132 @@ def setup_google_sheets_connection():
         return None, None
 
 
+def _sheet_cache_key(sheet):
+    """
+    Calcola la chiave di cache dalla revisione Drive del Google Sheet
+    
+    Args:
+        sheet: Oggetto Google Sheet
+        
+    Returns:
+        str: Chiave cache o None se la revisione non è disponibile
+    """
+    try:
+        spreadsheet = sheet.spreadsheet
+        modified_time = spreadsheet.get_lastUpdateTime()
+    except Exception as e:
+        print(f"⚠️ Revisione sheet non disponibile, cache disabilitata: {e}")
+        return None
+    
+    # L'impronta del codice invalida anche i dati grezzi se cambia il modo di scaricarli
+    revision = hashlib.blake2b(f"{sheet.id}:{modified_time}:{_MODULE_DIGEST}".encode(), digest_size=8).hexdigest()
+    return f"sheet_{spreadsheet.id}_{revision}"
+
+
+def _prune_cache(prefix, keep):
+    """
+    Rimuove le versioni obsolete dei file in cache
+    
+    Args:
+        prefix (str): Prefisso dei file da controllare
+        keep (Path): File da conservare
+    """
+    for old_file in CACHE_DIR.glob(f"{prefix}*.pkl"):
+        if old_file != keep:
+            old_file.unlink(missing_ok=True)
+
+
+def _fetch_sheet_records(sheet):
+    """
+    Scarica i record dal Google Sheet usando la cache locale se aggiornata
+    
+    Args:
+        sheet: Oggetto Google Sheet
+        
+    Returns:
+        pandas.DataFrame: Dati grezzi (vuoto se il foglio non ha record)
+        str: Chiave cache o None
+    """
+    cache_key = _sheet_cache_key(sheet)
+    cache_file = CACHE_DIR / f"{cache_key}.pkl" if cache_key else None
+    
+    if cache_file and cache_file.exists():
+        try:
+            data = pd.read_pickle(cache_file)
+            print(f"Dati caricati dalla cache locale: {cache_file}")
+            return data, cache_key
+        except Exception as e:
+            print(f"⚠️ Cache dati non leggibile, nuovo download: {e}")
+    
+    print("Caricamento dati da Google Sheets...")
+    # Una sola chiamata values.batchGet: valori formattati come in get_all_records,
+    # così date, percentuali e booleani arrivano agli export come nel foglio
+    response = sheet.spreadsheet.values_batch_get(
+        [gspread.utils.absolute_range_name(sheet.title)],
+        params={'valueRenderOption': 'FORMATTED_VALUE'}
+    )
+    rows = response['valueRanges'][0].get('values', [])
+    
+    if rows:
+        # Le API troncano le celle vuote finali: le righe corte vengono completate con ''.
+        # Le celle oltre l'header (es. note a mano in colonna O) vengono scartate
+        width = len(rows[0])
+        data = pd.DataFrame([row[:width] for row in rows[1:]], columns=rows[0]).fillna('')
+    else:
+        data = pd.DataFrame()
+    
+    if cache_file:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        data.to_pickle(cache_file)
+        _prune_cache(cache_key.rsplit('_', 1)[0] + '_', cache_file)
+    
+    return data, cache_key
+
+
+def _parse_timestamp_column(column):
+    """
+    Converte una colonna di timestamp (stringhe ISO o numeri seriali Sheets) in datetime UTC
+    
+    Args:
+        column (pd.Series): Colonna grezza
+        
+    Returns:
+        pd.Series: Colonna datetime UTC (NaT se non convertibile)
+    """
+    serials = pd.to_numeric(column, errors='coerce')
+    # ISO8601 usa il parser C vettorizzato e accetta sia 'T' che spazio come separatore
+    parsed = pd.to_datetime(column.where(serials.isna()), format='ISO8601', errors='coerce', utc=True)
+    
+    # Numeri seriali: giorni dall'epoca di Google Sheets (30/12/1899)
+    # (solo i valori numerici: la conversione per unità può andare in overflow sui NaN)
+    serials = serials.dropna()
+    if serials.empty:
+        return parsed
+    from_serials = pd.to_datetime(serials, unit='D', origin='1899-12-30', utc=True)
+    return parsed.fillna(from_serials)
+
+
+def _completed_mask(column):
+    """
+    Calcola il flag di completamento valutando la regex solo sui valori distinti
+    
+    Args:
+        column (pd.Series): Colonna 'Completato'
+        
+    Returns:
+        numpy.ndarray: Array booleano, True per le sessioni completate
+    """
+    categorical = column.astype('category')
+    completed = np.asarray(
+        categorical.cat.categories.astype(str).str.contains(_COMPLETED_RE, na=False),
+        dtype=bool
+    )
+    
+    # Codice -1 (valore mancante) → ultimo elemento, sempre False
+    lookup = np.append(completed, False)
+    return lookup[categorical.cat.codes.to_numpy()]
+
+
 def load_data_from_sheets(sheet):
     """
     Carica e pulisce dati da Google Sheets
@@ -72,16 +266,12 @@ def load_data_from_sheets(sheet):
         pandas.DataFrame: Dati puliti o None se errore
     """
     try:
-        print("Caricamento dati da Google Sheets...")
-        
-        raw_data = sheet.get_all_records()
+        data, cache_key = _fetch_sheet_records(sheet)
         
-        if not raw_data:
+        if data.empty:
             print("⚠️ Nessun dato trovato nel Google Sheet")
             return None
             
-        # Converti in DataFrame
-        data = pd.DataFrame(raw_data)
         print(f"Righe caricate: {len(data)}")
         
         # Pulisci e converti timestamp
@@ -90,7 +280,7 @@ def load_data_from_sheets(sheet):
         
         for col in timestamp_cols:
             if col in data.columns:
-                data[col] = pd.to_datetime(data[col], errors='coerce', utc=True)
+                data[col] = _parse_timestamp_column(data[col])
         
         # Filtra righe vuote
         initial_count = len(data)
@@ -104,6 +294,21 @@ def load_data_from_sheets(sheet):
             print("Prime 3 righe:")
             print(data.head(3).to_string())
         
+        # Colonne a bassa cardinalità come category: value_counts e groupby lavorano sui codici interi
+        # (i valori vengono uniformati a stringa per evitare categorie miste testo/numero)
+        for col in CATEGORICAL_COLUMNS:
+            if col in data.columns:
+                data[col] = data[col].astype(str).astype('category')
+        
+        # Flag completamento calcolato una sola volta per tutte le metriche
+        if 'Completato' in data.columns:
+            data['_completed'] = _completed_mask(data['Completato'])
+        else:
+            data['_completed'] = False
+        
+        # Chiave usata da load_cached_metrics/save_cached_metrics
+        data.attrs['cache_key'] = cache_key
+        
         return data
         
     except Exception as e:
@@ -111,6 +316,66 @@ def load_data_from_sheets(sheet):
         return None
 
 
+def _metrics_cache_file(data):
+    """
+    Restituisce il file cache delle metriche associato al dataset
+    
+    Args:
+        data (pd.DataFrame): Dataset caricato da load_data_from_sheets
+        
+    Returns:
+        Path: File cache o None se il dataset non ha chiave cache
+    """
+    cache_key = data.attrs.get('cache_key')
+    if not cache_key:
+        return None
+    # Le metriche temporali dipendono dal giorno corrente
+    today = datetime.now().strftime('%Y%m%d')
+    return CACHE_DIR / f"metrics_{cache_key}_{_MODULE_DIGEST}{today}.pkl"
+
+
+def load_cached_metrics(data):
+    """
+    Carica le metriche calcolate in precedenza per la stessa revisione dei dati
+    
+    Args:
+        data (pd.DataFrame): Dataset caricato da load_data_from_sheets
+        
+    Returns:
+        dict: Metriche in cache o None se assenti
+    """
+    cache_file = _metrics_cache_file(data)
+    if not cache_file or not cache_file.exists():
+        return None
+    
+    try:
+        with open(cache_file, 'rb') as f:
+            metrics = pickle.load(f)
+        print(f"Metriche caricate dalla cache locale: {cache_file}")
+        return metrics
+    except Exception as e:
+        print(f"⚠️ Cache metriche non leggibile, ricalcolo: {e}")
+        return None
+
+
+def save_cached_metrics(data, metrics):
+    """
+    Salva le metriche calcolate per riutilizzarle sulla stessa revisione dei dati
+    
+    Args:
+        data (pd.DataFrame): Dataset caricato da load_data_from_sheets
+        metrics (dict): Metriche calcolate
+    """
+    cache_file = _metrics_cache_file(data)
+    if not cache_file:
+        return
+    
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(cache_file, 'wb') as f:
+        pickle.dump(metrics, f)
+    _prune_cache(cache_file.name.rsplit('_', 2)[0] + '_', cache_file)
+
+
 def calculate_basic_metrics(data):
     """
     Calcola metriche base del sistema
@@ -126,7 +391,7 @@ def calculate_basic_metrics(data):
     
     metrics = {}
     metrics['total_sessions'] = len(data)
-    metrics['completed_sessions'] = len(data[data['Completato'].str.lower().str.contains('sì|si|yes|true', na=False)])
+    metrics['completed_sessions'] = int(data['_completed'].sum())
     metrics['conversion_rate'] = (metrics['completed_sessions'] / metrics['total_sessions'] * 100) if metrics['total_sessions'] > 0 else 0
     
     print(f"📈 Sessioni totali: {metrics['total_sessions']}")
@@ -156,12 +421,19 @@ def calculate_funnel_metrics(data):
         status_counts = data['Stato'].value_counts()
         funnel_metrics['status_breakdown'] = status_counts.to_dict()
     
-    # Drop-off analysis
-    page_opens = len(data[data['Stato'].str.contains('page_opened|started|form_started', na=False)])
-    form_starts = len(data[data['Stato'].str.contains('form_started', na=False)])
-    step2_completes = len(data[data['Stato'].str.contains('step2_completed', na=False)])
-    step3_completes = len(data[data['Stato'].str.contains('step3_completed', na=False)])
-    full_completes = len(data[data['Stato'].str.contains('fully_completed', na=False)])
+    # Drop-off analysis: le regex degli stage girano solo sui valori distinti di Stato
+    codes, uniques = pd.factorize(data['Stato'], sort=False)
+    unique_states = pd.Series(uniques)
+    stage_matrix = np.column_stack([
+        unique_states.str.contains(pattern, na=False).to_numpy(dtype=bool)
+        for pattern in _STAGE_PATTERNS
+    ])
+    state_counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    
+    # Un solo prodotto matrice-vettore restituisce i conteggi di tutti gli stage
+    page_opens, form_starts, step2_completes, step3_completes, full_completes = (
+        state_counts @ stage_matrix
+    ).tolist()
     
     # Se non abbiamo stati specifici, usa stime
     if page_opens == 0:
@@ -172,7 +444,7 @@ def calculate_funnel_metrics(data):
         'form_starts': form_starts if form_starts > 0 else int(page_opens * 0.6),
         'step2_completes': step2_completes if step2_completes > 0 else int(page_opens * 0.4),
         'step3_completes': step3_completes if step3_completes > 0 else int(page_opens * 0.25),
-        'full_completes': full_completes if full_completes > 0 else len(data[data['Completato'].str.lower().str.contains('sì|si|yes|true', na=False)])
+        'full_completes': full_completes if full_completes > 0 else int(data['_completed'].sum())
     }
     
     return funnel_metrics
@@ -194,15 +466,12 @@ def calculate_location_metrics(data):
         qr_locations = data['Dove Trovato QR'].value_counts()
         location_metrics['qr_locations'] = qr_locations.to_dict()
         
-        # Conversion rate per posizione
-        location_conversion = {}
-        for location in qr_locations.index:
-            if pd.isna(location) or location == '':
-                continue
-            location_data = data[data['Dove Trovato QR'] == location]
-            completed = len(location_data[location_data['Completato'].str.lower().str.contains('sì|si|yes|true', na=False)])
-            total = len(location_data)
-            location_conversion[location] = (completed / total * 100) if total > 0 else 0
+        # Conversion rate per posizione con un solo groupby
+        by_location = data.groupby('Dove Trovato QR', observed=True, sort=False)['_completed'].agg(
+            total='size', done='sum'
+        )
+        by_location = by_location.drop('', errors='ignore')
+        location_conversion = (by_location['done'] / by_location['total'] * 100).to_dict()
         
         location_metrics['location_conversion'] = location_conversion
         print(f"🎯 Posizioni QR analizzate: {len(location_conversion)}")
@@ -255,29 +524,299 @@ def calculate_temporal_metrics(data):
     if 'Apertura Pagina' in data.columns:
         valid_dates = data['Apertura Pagina'].dropna()
         if len(valid_dates) > 0:
-            recent_data = data[data['Apertura Pagina'] >= datetime.now(tz=valid_dates.iloc[0].tz) - timedelta(days=7)]
-            temporal_metrics['recent_activity'] = len(recent_data)
+            recent_dates = valid_dates[valid_dates >= datetime.now(tz=valid_dates.iloc[0].tz) - timedelta(days=7)]
+            temporal_metrics['recent_activity'] = len(recent_dates)
             
-            # Trend giornaliero
-            if len(recent_data) > 0:
-                daily_counts = recent_data.groupby(recent_data['Apertura Pagina'].dt.date).size()
-                temporal_metrics['daily_trend'] = {str(k): v for k, v in daily_counts.to_dict().items()}
+            # Trend giornaliero: giorni dall'epoca come interi e np.bincount, senza oggetti date per riga
+            if len(recent_dates) > 0:
+                days = recent_dates.values.astype('datetime64[D]').astype(np.int64)
+                first_day = int(days.min())
+                daily_counts = np.bincount(days - first_day)
+                temporal_metrics['daily_trend'] = {
+                    str(np.datetime64(first_day + offset, 'D')): count
+                    for offset, count in enumerate(daily_counts.tolist()) if count > 0
+                }
     
     return temporal_metrics
 
 
+def _svg_text(x, y, text, size=12, weight='normal', anchor='middle', rotate=None, color='#222222'):
+    """
+    Crea un elemento <text> SVG con il testo già escapato
+
+    Args:
+        x, y (float): Posizione del testo
+        text (str): Contenuto
+        size (int): Dimensione font
+        weight (str): Peso font
+        anchor (str): Allineamento (start, middle, end)
+        rotate (float): Rotazione in gradi attorno al punto (x, y)
+        color (str): Colore testo
+
+    Returns:
+        str: Elemento SVG
+    """
+    transform = f' transform="rotate({rotate} {x:.1f} {y:.1f})"' if rotate else ''
+    return (f'<text x="{x:.1f}" y="{y:.1f}" font-size="{size}" font-weight="{weight}" '
+            f'text-anchor="{anchor}" fill="{color}"{transform}>{html.escape(str(text))}</text>')
+
+
+def _svg_document(width, height, elements):
+    """
+    Assembla un documento SVG completo con sfondo bianco
+
+    Args:
+        width, height (int): Dimensioni in pixel
+        elements (list): Elementi SVG da includere
+
+    Returns:
+        str: Documento SVG
+    """
+    return '\n'.join([
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="DejaVu Sans, Arial, sans-serif">',
+        f'<rect width="{width}" height="{height}" fill="white"/>',
+        *elements,
+        '</svg>'
+    ])
+
+
+def _sample_palette(palette, count):
+    """
+    Campiona uniformemente una palette su n colori
+
+    Args:
+        palette (list): Colori disponibili
+        count (int): Numero colori richiesti
+
+    Returns:
+        list: Colori campionati
+    """
+    if count <= 1:
+        return palette[:count]
+    return [palette[round(i * (len(palette) - 1) / (count - 1))] for i in range(count)]
+
+
+def _chart_stamp(metrics, output_dir, chart_name):
+    """
+    Restituisce il file stamp che identifica un grafico generato da queste metriche
+
+    Args:
+        metrics (Mapping): Metriche calcolate (dict o ChainMap)
+        output_dir (str): Directory output
+        chart_name (str): Nome del grafico (senza estensione)
+
+    Returns:
+        Path: File stamp, presente solo se il grafico è già aggiornato
+    """
+    payload = json.dumps(dict(metrics), sort_keys=True, default=str) + _MODULE_DIGEST
+    digest = hashlib.blake2b(payload.encode('utf-8'), digest_size=8).hexdigest()
+    return Path(output_dir) / f'.{chart_name}_{digest}.stamp'
+
+
+def _chart_is_current(stamp, chart_name):
+    """Verifica che il grafico esista e sia stato generato dalle stesse metriche"""
+    return stamp.exists() and (stamp.parent / f'{chart_name}.svg').exists()
+
+
+def _save_chart(svg, stamp, chart_name):
+    """
+    Scrive il grafico SVG e aggiorna il relativo stamp
+
+    Args:
+        svg (str): Documento SVG
+        stamp (Path): File stamp delle metriche correnti
+        chart_name (str): Nome del grafico (senza estensione)
+    """
+    (stamp.parent / f'{chart_name}.svg').write_text(svg, encoding='utf-8')
+    for old_stamp in stamp.parent.glob(f'.{chart_name}_*.stamp'):
+        old_stamp.unlink(missing_ok=True)
+    stamp.touch()
+
+
+def _truncate_label(label, max_length):
+    """Accorcia le etichette lunghe aggiungendo '...'"""
+    label = str(label)
+    return label[:max_length] + '...' if len(label) > max_length else label
+
+
+def _svg_bar_panel(x, y, width, height, title, labels, values, colors, ylabel=''):
+    """
+    Disegna un grafico a barre verticali con il valore sopra ogni barra
+
+    Args:
+        x, y, width, height (float): Area del pannello
+        title (str): Titolo
+        labels (list): Etichette asse X
+        values (list): Valori delle barre
+        colors (list): Colori delle barre
+        ylabel (str): Etichetta asse Y
+
+    Returns:
+        list: Elementi SVG
+    """
+    elements = [_svg_text(x + width / 2, y + 30, title, size=18, weight='bold')]
+    left, right = x + 70, x + width - 20
+    top, bottom = y + 70, y + height - 110
+    max_value = max(values) or 1
+    slot = (right - left) / len(values)
+    bar_width = slot * 0.8
+
+    for i, (label, value, color) in enumerate(zip(labels, values, colors)):
+        bar_height = value / max_value * (bottom - top)
+        bar_x = left + i * slot + (slot - bar_width) / 2
+        center = bar_x + bar_width / 2
+        elements.append(f'<rect x="{bar_x:.1f}" y="{bottom - bar_height:.1f}" width="{bar_width:.1f}" '
+                        f'height="{bar_height:.1f}" fill="{color}"/>')
+        elements.append(_svg_text(center, bottom - bar_height - 6, f'{int(value)}', weight='bold'))
+        elements.append(_svg_text(center, bottom + 16, label, anchor='end', rotate=-45))
+
+    elements.append(f'<line x1="{left}" y1="{bottom}" x2="{right}" y2="{bottom}" stroke="#444444"/>')
+    if ylabel:
+        elements.append(_svg_text(x + 25, (top + bottom) / 2, ylabel, size=13, rotate=-90))
+    return elements
+
+
+def _svg_hbar_panel(x, y, width, height, title, labels, values, colors, xlabel=''):
+    """
+    Disegna un grafico a barre orizzontali con il valore percentuale a fianco
+
+    Args:
+        x, y, width, height (float): Area del pannello
+        title (str): Titolo
+        labels (list): Etichette asse Y
+        values (list): Valori percentuali
+        colors (list): Colori delle barre
+        xlabel (str): Etichetta asse X
+
+    Returns:
+        list: Elementi SVG
+    """
+    elements = [_svg_text(x + width / 2, y + 30, title, size=18, weight='bold')]
+    left, right = x + 220, x + width - 80
+    top, bottom = y + 60, y + height - 50
+    max_value = max(values) or 1
+    slot = (bottom - top) / len(values)
+    bar_height = slot * 0.8
+
+    for i, (label, value, color) in enumerate(zip(labels, values, colors)):
+        bar_width = value / max_value * (right - left)
+        bar_y = top + i * slot + (slot - bar_height) / 2
+        middle = bar_y + bar_height / 2 + 4
+        elements.append(f'<rect x="{left}" y="{bar_y:.1f}" width="{bar_width:.1f}" '
+                        f'height="{bar_height:.1f}" fill="{color}"/>')
+        elements.append(_svg_text(left - 8, middle, label, anchor='end'))
+        elements.append(_svg_text(left + bar_width + 6, middle, f'{value:.1f}%', weight='bold', anchor='start'))
+
+    elements.append(f'<line x1="{left}" y1="{top}" x2="{left}" y2="{bottom}" stroke="#444444"/>')
+    if xlabel:
+        elements.append(_svg_text((left + right) / 2, bottom + 35, xlabel, size=13))
+    return elements
+
+
+def _svg_pie_panel(x, y, width, height, title, labels, values, colors):
+    """
+    Disegna un grafico a torta con etichette esterne e percentuali interne
+
+    Args:
+        x, y, width, height (float): Area del pannello
+        title (str): Titolo
+        labels (list): Etichette delle fette
+        values (list): Valori delle fette
+        colors (list): Colori delle fette
+
+    Returns:
+        list: Elementi SVG
+    """
+    elements = [_svg_text(x + width / 2, y + 30, title, size=18, weight='bold')]
+    total = sum(values)
+    if total <= 0:
+        return elements
+
+    cx, cy = x + width / 2, y + 50 + (height - 50) / 2
+    radius = min(width, height - 50) * 0.32
+    angle = -math.pi / 2
+
+    for label, value, color in zip(labels, values, colors):
+        sweep = value / total * 2 * math.pi
+        if sweep >= 2 * math.pi - 1e-9:
+            elements.append(f'<circle cx="{cx:.1f}" cy="{cy:.1f}" r="{radius:.1f}" fill="{color}" stroke="white"/>')
+        elif sweep > 0:
+            x1, y1 = cx + radius * math.cos(angle), cy + radius * math.sin(angle)
+            x2, y2 = cx + radius * math.cos(angle + sweep), cy + radius * math.sin(angle + sweep)
+            large_arc = 1 if sweep > math.pi else 0
+            elements.append(f'<path d="M {cx:.1f} {cy:.1f} L {x1:.1f} {y1:.1f} '
+                            f'A {radius:.1f} {radius:.1f} 0 {large_arc} 1 {x2:.1f} {y2:.1f} Z" '
+                            f'fill="{color}" stroke="white"/>')
+
+        middle = angle + sweep / 2
+        cos_m, sin_m = math.cos(middle), math.sin(middle)
+        elements.append(_svg_text(cx + radius * 0.6 * cos_m, cy + radius * 0.6 * sin_m + 4,
+                                  f'{value / total * 100:.1f}%', weight='bold', color='black'))
+        elements.append(_svg_text(cx + radius * 1.15 * cos_m, cy + radius * 1.15 * sin_m + 4, label,
+                                  anchor='start' if cos_m >= 0 else 'end'))
+        angle += sweep
+    return elements
+
+
+def _svg_line_panel(x, y, width, height, title, labels, values, xlabel='', ylabel=''):
+    """
+    Disegna un grafico a linea con marker e valore annotato su ogni punto
+
+    Args:
+        x, y, width, height (float): Area del pannello
+        title (str): Titolo
+        labels (list): Etichette asse X
+        values (list): Valori
+        xlabel, ylabel (str): Etichette assi
+
+    Returns:
+        list: Elementi SVG
+    """
+    elements = [_svg_text(x + width / 2, y + 30, title, size=18, weight='bold')]
+    left, right = x + 80, x + width - 40
+    top, bottom = y + 70, y + height - 110
+    max_value = max(values) * 1.15 or 1
+    step = (right - left) / max(len(values) - 1, 1)
+
+    # Griglia tratteggiata
+    for fraction in (0.25, 0.5, 0.75, 1.0):
+        grid_y = bottom - fraction * (bottom - top)
+        elements.append(f'<line x1="{left}" y1="{grid_y:.1f}" x2="{right}" y2="{grid_y:.1f}" '
+                        f'stroke="#cccccc" stroke-dasharray="4 4"/>')
+    elements.append(f'<line x1="{left}" y1="{bottom}" x2="{right}" y2="{bottom}" stroke="#444444"/>')
+
+    points = [(left + i * step, bottom - value / max_value * (bottom - top)) for i, value in enumerate(values)]
+    path = ' '.join(f'{px:.1f},{py:.1f}' for px, py in points)
+    elements.append(f'<polyline points="{path}" fill="none" stroke="#2E86AB" stroke-width="3"/>')
+
+    for (px, py), label, value in zip(points, labels, values):
+        elements.append(f'<circle cx="{px:.1f}" cy="{py:.1f}" r="6" fill="#A23B72" stroke="white" stroke-width="2"/>')
+        elements.append(_svg_text(px, py - 14, f'{int(value)}', weight='bold'))
+        elements.append(_svg_text(px, bottom + 16, label, anchor='end', rotate=-45))
+
+    if xlabel:
+        elements.append(_svg_text((left + right) / 2, y + height - 15, xlabel, size=13))
+    if ylabel:
+        elements.append(_svg_text(x + 25, (top + bottom) / 2, ylabel, size=13, rotate=-90))
+    return elements
+
+
 def create_conversion_charts(metrics, output_dir='docs/analytics'):
     """
     Crea grafici per analisi conversione
-    
+
     Args:
         metrics (dict): Metriche calcolate
         output_dir (str): Directory output
     """
+    stamp = _chart_stamp(metrics, output_dir, 'conversion_analysis')
+    if _chart_is_current(stamp, 'conversion_analysis'):
+        return
+
     os.makedirs(output_dir, exist_ok=True)
-    
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
-    
+    elements = []
+
     # 1. Conversion Funnel
     funnel_data = metrics.get('funnel', {})
     if funnel_data:
@@ -289,156 +828,96 @@ def create_conversion_charts(metrics, output_dir='docs/analytics'):
             funnel_data.get('step3_completes', 0),
             funnel_data.get('full_completes', 0)
         ]
-        
+
         colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd']
-        bars = ax1.bar(stages, values, color=colors)
-        ax1.set_title('Conversion Funnel', fontsize=16, fontweight='bold', pad=20)
-        ax1.set_ylabel('Numero Utenti', fontsize=12)
-        ax1.tick_params(axis='x', rotation=45)
-        
-        # Aggiungi valori sopra le barre
-        for bar, value in zip(bars, values):
-            height = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width()/2, height + max(values)*0.01,
-                    f'{int(value)}', ha='center', va='bottom', fontweight='bold', fontsize=10)
-    
+        elements += _svg_bar_panel(0, 0, 750, 600, 'Conversion Funnel', stages, values, colors,
+                                   ylabel='Numero Utenti')
+
     # 2. QR Location Effectiveness
     location_data = metrics.get('location_conversion', {})
     if location_data and len(location_data) > 0:
-        sorted_locations = sorted(location_data.items(), key=lambda x: x[1], reverse=True)[:6]
-        locations = [loc[:25] + '...' if len(loc) > 25 else loc for loc, _ in sorted_locations]
+        sorted_locations = heapq.nlargest(6, location_data.items(), key=lambda x: x[1])
+        locations = [_truncate_label(loc, 25) for loc, _ in sorted_locations]
         conversions = [conv for _, conv in sorted_locations]
-        
-        colors_bar = plt.cm.viridis(np.linspace(0, 1, len(locations)))
-        bars = ax2.barh(locations, conversions, color=colors_bar)
-        ax2.set_title('Conversion Rate per Posizione QR', fontsize=16, fontweight='bold', pad=20)
-        ax2.set_xlabel('Conversion Rate (%)', fontsize=12)
-        
-        # Aggiungi valori
-        for i, (bar, v) in enumerate(zip(bars, conversions)):
-            width = bar.get_width()
-            ax2.text(width + max(conversions)*0.01, bar.get_y() + bar.get_height()/2, 
-                    f'{v:.1f}%', va='center', fontweight='bold', fontsize=10)
-    
-    plt.tight_layout()
-    plt.savefig(f'{output_dir}/conversion_analysis.png', dpi=300, bbox_inches='tight', 
-               facecolor='white', edgecolor='none')
-    plt.close()
+
+        colors_bar = _sample_palette(_VIRIDIS, len(locations))
+        elements += _svg_hbar_panel(750, 0, 750, 600, 'Conversion Rate per Posizione QR', locations,
+                                    conversions, colors_bar, xlabel='Conversion Rate (%)')
+
+    svg = _svg_document(1500, 600, elements)
+    _save_chart(svg, stamp, 'conversion_analysis')
 
 
 def create_demographic_charts(metrics, output_dir='docs/analytics'):
     """
     Crea grafici per analisi demografica
-    
+
     Args:
         metrics (dict): Metriche calcolate
         output_dir (str): Directory output
     """
-    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-    fig.suptitle('Analisi Demografica Completa', fontsize=18, fontweight='bold', y=0.95)
-    
+    stamp = _chart_stamp(metrics, output_dir, 'demographics_analysis')
+    if _chart_is_current(stamp, 'demographics_analysis'):
+        return
+
+    os.makedirs(output_dir, exist_ok=True)
+    elements = [_svg_text(800, 40, 'Analisi Demografica Completa', size=22, weight='bold')]
+
     # Age Distribution
     age_data = metrics.get('age_distribution', {})
     if age_data and len(age_data) > 0:
-        wedges, texts, autotexts = axes[0, 0].pie(
-            age_data.values(), 
-            labels=age_data.keys(), 
-            autopct='%1.1f%%',
-            colors=plt.cm.Set3(np.linspace(0, 1, len(age_data)))
-        )
-        axes[0, 0].set_title('Distribuzione Età', fontweight='bold', fontsize=14)
-        for autotext in autotexts:
-            autotext.set_color('black')
-            autotext.set_fontweight('bold')
-    
+        elements += _svg_pie_panel(0, 60, 800, 570, 'Distribuzione Età', list(age_data.keys()),
+                                   list(age_data.values()), _sample_palette(_SET3, len(age_data)))
+
     # Gender Distribution
     gender_data = metrics.get('gender_distribution', {})
     if gender_data and len(gender_data) > 0:
         colors_gender = ['#ff9999', '#66b3ff', '#99ff99', '#ffcc99'][:len(gender_data)]
-        wedges, texts, autotexts = axes[0, 1].pie(
-            gender_data.values(), 
-            labels=gender_data.keys(), 
-            autopct='%1.1f%%',
-            colors=colors_gender
-        )
-        axes[0, 1].set_title('Distribuzione Genere', fontweight='bold', fontsize=14)
-        for autotext in autotexts:
-            autotext.set_color('black')
-            autotext.set_fontweight('bold')
-    
+        elements += _svg_pie_panel(800, 60, 800, 570, 'Distribuzione Genere', list(gender_data.keys()),
+                                   list(gender_data.values()), colors_gender)
+
     # Education Distribution
     edu_data = metrics.get('education_distribution', {})
     if edu_data and len(edu_data) > 0:
-        edu_keys = list(edu_data.keys())
-        edu_values = list(edu_data.values())
-        colors_edu = plt.cm.Pastel1(np.linspace(0, 1, len(edu_data)))
-        
-        bars = axes[1, 0].bar(range(len(edu_keys)), edu_values, color=colors_edu)
-        axes[1, 0].set_title('Distribuzione Titolo Studio', fontweight='bold', fontsize=14)
-        axes[1, 0].set_xticks(range(len(edu_keys)))
-        axes[1, 0].set_xticklabels([k[:15] + '...' if len(k) > 15 else k for k in edu_keys], 
-                                  rotation=45, ha='right')
-        axes[1, 0].set_ylabel('Numero Utenti')
-        
-        for bar, value in zip(bars, edu_values):
-            height = bar.get_height()
-            axes[1, 0].text(bar.get_x() + bar.get_width()/2, height + max(edu_values)*0.01,
-                           f'{int(value)}', ha='center', va='bottom', fontweight='bold')
-    
+        edu_keys = [_truncate_label(k, 15) for k in edu_data.keys()]
+        elements += _svg_bar_panel(0, 630, 800, 570, 'Distribuzione Titolo Studio', edu_keys,
+                                   list(edu_data.values()), _sample_palette(_PASTEL1, len(edu_data)),
+                                   ylabel='Numero Utenti')
+
     # QR Location Distribution
     qr_data = metrics.get('qr_locations', {})
     if qr_data and len(qr_data) > 0:
         top_qr = dict(list(qr_data.items())[:6])
-        colors_qr = plt.cm.Set2(np.linspace(0, 1, len(top_qr)))
-        
-        bars = axes[1, 1].bar(range(len(top_qr)), list(top_qr.values()), color=colors_qr)
-        axes[1, 1].set_title('Posizioni QR Più Popolari', fontweight='bold', fontsize=14)
-        axes[1, 1].set_xticks(range(len(top_qr)))
-        axes[1, 1].set_xticklabels([loc[:15] + '...' if len(loc) > 15 else loc 
-                                  for loc in top_qr.keys()], rotation=45, ha='right')
-        axes[1, 1].set_ylabel('Numero Accessi')
-        
-        for bar, value in zip(bars, top_qr.values()):
-            height = bar.get_height()
-            axes[1, 1].text(bar.get_x() + bar.get_width()/2, height + max(top_qr.values())*0.01,
-                           f'{int(value)}', ha='center', va='bottom', fontweight='bold')
-    
-    plt.tight_layout()
-    plt.savefig(f'{output_dir}/demographics_analysis.png', dpi=300, bbox_inches='tight',
-               facecolor='white', edgecolor='none')
-    plt.close()
+        elements += _svg_bar_panel(800, 630, 800, 570, 'Posizioni QR Più Popolari',
+                                   [_truncate_label(loc, 15) for loc in top_qr.keys()],
+                                   list(top_qr.values()), _sample_palette(_SET2, len(top_qr)),
+                                   ylabel='Numero Accessi')
+
+    svg = _svg_document(1600, 1200, elements)
+    _save_chart(svg, stamp, 'demographics_analysis')
 
 
 def create_temporal_charts(metrics, output_dir='docs/analytics'):
     """
     Crea grafici per analisi temporale
-    
+
     Args:
-        metrics (dict): Metriche calcolate  
+        metrics (dict): Metriche calcolate
         output_dir (str): Directory output
     """
     daily_trend = metrics.get('daily_trend', {})
     if daily_trend and len(daily_trend) > 1:
-        plt.figure(figsize=(14, 6))
-        dates = list(daily_trend.keys())
-        counts = list(daily_trend.values())
-        
-        plt.plot(dates, counts, marker='o', linewidth=3, markersize=8, 
-                color='#2E86AB', markerfacecolor='#A23B72', markeredgecolor='white', markeredgewidth=2)
-        plt.title('Trend Accessi Ultimi 7 Giorni', fontsize=16, fontweight='bold', pad=20)
-        plt.xlabel('Data', fontsize=12)
-        plt.ylabel('Numero Accessi', fontsize=12)
-        plt.xticks(rotation=45)
-        plt.grid(True, alpha=0.3, linestyle='--')
-        
-        for i, (date, count) in enumerate(zip(dates, counts)):
-            plt.annotate(f'{int(count)}', (i, count), textcoords="offset points", 
-                       xytext=(0,10), ha='center', fontweight='bold')
-        
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/daily_trend.png', dpi=300, bbox_inches='tight',
-                   facecolor='white', edgecolor='none')
-        plt.close()
+        stamp = _chart_stamp(metrics, output_dir, 'daily_trend')
+        if _chart_is_current(stamp, 'daily_trend'):
+            return
+
+        os.makedirs(output_dir, exist_ok=True)
+        elements = _svg_line_panel(0, 0, 1400, 600, 'Trend Accessi Ultimi 7 Giorni',
+                                   list(daily_trend.keys()), list(daily_trend.values()),
+                                   xlabel='Data', ylabel='Numero Accessi')
+
+        svg = _svg_document(1400, 600, elements)
+        _save_chart(svg, stamp, 'daily_trend')
 
 
 def generate_markdown_report(all_metrics, output_file='docs/analytics-report.md'):
@@ -457,7 +936,7 @@ def generate_markdown_report(all_metrics, output_file='docs/analytics-report.md'
     conversion_rate = all_metrics.get('conversion_rate', 0)
     recent_activity = all_metrics.get('recent_activity', 0)
     
-    report_content = f"""# 📊 Cybersecurity Education - Analytics Report
+    parts = [f"""# 📊 Cybersecurity Education - Analytics Report
 
 **Ultimo aggiornamento:** {datetime.now().strftime("%Y-%m-%d %H:%M:%S")} UTC
 
@@ -472,15 +951,15 @@ def generate_markdown_report(all_metrics, output_file='docs/analytics-report.md'
 
 ## 📈 Funnel di Conversione
 
-![Conversion Analysis](analytics/conversion_analysis.png)
+![Conversion Analysis](analytics/conversion_analysis.svg)
 
 ### Dettaglio Progressione:
-"""
+"""]
     
     funnel = all_metrics.get('funnel', {})
     if funnel:
         total_opens = funnel.get('page_opens', 1)
-        report_content += f"""
+        parts.append(f"""
 | Stage | Utenti | % del Totale | Drop-off |
 |-------|--------|--------------|----------|
 | **Aperture Pagina** | {funnel.get('page_opens', 0):,} | 100.0% | - |
@@ -488,21 +967,22 @@ def generate_markdown_report(all_metrics, output_file='docs/analytics-report.md'
 | **Step 2 Completato** | {funnel.get('step2_completes', 0):,} | {(funnel.get('step2_completes', 0)/total_opens*100):.1f}% | {((funnel.get('form_starts', 0) - funnel.get('step2_completes', 0))/total_opens*100):.1f}% |
 | **Step 3 Completato** | {funnel.get('step3_completes', 0):,} | {(funnel.get('step3_completes', 0)/total_opens*100):.1f}% | {((funnel.get('step2_completes', 0) - funnel.get('step3_completes', 0))/total_opens*100):.1f}% |
 | **Completamento Totale** | {funnel.get('full_completes', 0):,} | {(funnel.get('full_completes', 0)/total_opens*100):.1f}% | {((funnel.get('step3_completes', 0) - funnel.get('full_completes', 0))/total_opens*100):.1f}% |
-"""
+""")
 
-    report_content += """
+    parts.append("""
 ## 🎭 Efficacia Posizioni QR Code
 
-"""
+""")
     
     location_conv = all_metrics.get('location_conversion', {})
     if location_conv:
-        sorted_locations = sorted(location_conv.items(), key=lambda x: x[1], reverse=True)
+        # Solo le 8 posizioni migliori: heapq evita l'ordinamento completo
+        top_locations = heapq.nlargest(8, location_conv.items(), key=lambda x: x[1])
         
-        report_content += "| Posizione | Conversion Rate | Raccomandazione |\n"
-        report_content += "|-----------|-----------------|------------------|\n"
+        parts.append("| Posizione | Conversion Rate | Raccomandazione |\n")
+        parts.append("|-----------|-----------------|------------------|\n")
         
-        for location, rate in sorted_locations[:8]:
+        for location, rate in top_locations:
             if rate >= 15:
                 recommendation = "Ottima"
             elif rate >= 10:
@@ -512,43 +992,43 @@ def generate_markdown_report(all_metrics, output_file='docs/analytics-report.md'
             else:
                 recommendation = "Bassa"
                 
-            report_content += f"| {location} | {rate:.1f}% | {recommendation} |\n"
+            parts.append(f"| {location} | {rate:.1f}% | {recommendation} |\n")
     
-    report_content += """
+    parts.append("""
 ## 👥 Analisi Demografica
 
-![Demographics Analysis](analytics/demographics_analysis.png)
+![Demographics Analysis](analytics/demographics_analysis.svg)
 
 ### Insights Chiave:
-"""
+""")
 
     # Demographics insights
     age_dist = all_metrics.get('age_distribution', {})
     if age_dist:
-        most_vulnerable_age = max(age_dist, key=age_dist.get)
-        report_content += f"- **Fascia età più vulnerabile:** {most_vulnerable_age} ({age_dist[most_vulnerable_age]} utenti)\n"
+        most_vulnerable_age, age_count = max(age_dist.items(), key=lambda x: x[1])
+        parts.append(f"- **Fascia età più vulnerabile:** {most_vulnerable_age} ({age_count} utenti)\n")
     
     gender_dist = all_metrics.get('gender_distribution', {})
     if gender_dist:
         total_gender = sum(gender_dist.values())
         for gender, count in gender_dist.items():
             percentage = (count / total_gender * 100) if total_gender > 0 else 0
-            report_content += f"- **{gender}:** {count} utenti ({percentage:.1f}%)\n"
+            parts.append(f"- **{gender}:** {count} utenti ({percentage:.1f}%)\n")
     
     edu_dist = all_metrics.get('education_distribution', {})
     if edu_dist:
         most_vulnerable_edu = max(edu_dist, key=edu_dist.get)
-        report_content += f"- **Titolo studio più rappresentato:** {most_vulnerable_edu}\n"
+        parts.append(f"- **Titolo studio più rappresentato:** {most_vulnerable_edu}\n")
 
     if all_metrics.get('daily_trend'):
-        report_content += """
+        parts.append("""
 ## 📅 Trend Temporale
 
-![Daily Trend](analytics/daily_trend.png)
+![Daily Trend](analytics/daily_trend.svg)
 
-"""
+""")
 
-    report_content += f"""
+    parts.append(f"""
 ## 🔍 Analisi Dettagliata
 
 ### Punti di Forza:
@@ -572,23 +1052,46 @@ def generate_markdown_report(all_metrics, output_file='docs/analytics-report.md'
 *Report generato automaticamente da [Cybersecurity Education Analytics](https://github.com/tuousername/cybersecurity-education)*
 
 **🔄 Prossimo aggiornamento:** {(datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d %H:%M")} UTC
-"""
+""")
 
-    # Salva report
+    # Salva report (le sezioni vengono unite una sola volta)
+    report_content = ''.join(parts)
     os.makedirs('docs', exist_ok=True)
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(report_content)
+    Path(output_file).write_text(report_content, encoding='utf-8')
     
     print(f"✅ Report generato: {output_file}")
     return report_content
 
 
-def export_data_files(data, output_dir='docs/data'):
+def _most_frequent(distribution):
+    """Restituisce la chiave con il conteggio più alto di una distribuzione, o 'N/A'"""
+    return max(distribution, key=distribution.get) if distribution else 'N/A'
+
+
+def _csv_strings(values):
+    """
+    Converte una colonna nelle stringhe scritte da DataFrame.to_csv
+    
+    Args:
+        values (pd.Series | pd.Categorical): Colonna da esportare
+        
+    Returns:
+        pd.Series: Colonna di stringhe (NA per i valori mancanti)
+    """
+    values = pd.Series(values, copy=False)
+    if values.dtype.kind == 'M':
+        # Stesso formato di to_csv (es. 2026-10-01 10:00:00.123456+00:00)
+        return values.astype(str).astype('string').mask(values.isna())
+    return values.astype('string')
+
+
+def export_data_files(data, metrics, output_dir='docs/data'):
     """
     Esporta dati in diversi formati
     
     Args:
         data (pd.DataFrame): Dataset completo
+        metrics (dict): Metriche già calcolate, usate per il foglio di riepilogo
         output_dir (str): Directory output
     """
     if data is None or len(data) == 0:
@@ -598,20 +1101,45 @@ def export_data_files(data, output_dir='docs/data'):
     print("💾 Esportazione dati...")
     os.makedirs(output_dir, exist_ok=True)
     
-    # CSV export (anonimizzato)
-    export_data = data.copy()
+    # Colonne esportate senza copiare il DataFrame: i campi sensibili diventano
+    # una colonna categorica con il solo valore 'ANONIMIZZATO'
     sensitive_columns = ['Session ID', 'User Agent']
-    for col in sensitive_columns:
-        if col in export_data.columns:
-            export_data[col] = 'ANONIMIZZATO'
+    anonymized = pd.Categorical.from_codes(np.zeros(len(data), dtype=np.int8), ['ANONIMIZZATO'])
+    export_columns = {
+        col: anonymized if col in sensitive_columns else data[col]
+        for col in data.columns if col not in INTERNAL_COLUMNS
+    }
     
-    export_data.to_csv(f'{output_dir}/cybersecurity_data_anonymous.csv', index=False, encoding='utf-8')
+    # CSV export (anonimizzato) con il writer colonnare di PyArrow. Le colonne
+    # vengono convertite nelle stesse stringhe di DataFrame.to_csv (vuoto per i
+    # mancanti) e scritte senza virgolette, così il file resta identico a prima
+    csv_file = f'{output_dir}/cybersecurity_data_anonymous.csv'
+    csv_table = pa.table({
+        col: pa.array(_csv_strings(values), type=pa.string())
+        for col, values in export_columns.items()
+    })
+    try:
+        with open(csv_file, 'wb') as f:
+            # Header scritto da pandas: PyArrow lo metterebbe sempre tra virgolette
+            pd.DataFrame(columns=csv_table.column_names).to_csv(f, index=False, encoding='utf-8')
+            pa_csv.write_csv(
+                csv_table, f,
+                write_options=pa_csv.WriteOptions(include_header=False, quoting_style='none')
+            )
+    except pa.ArrowInvalid:
+        # Valori con virgole, virgolette o a capo: servono le virgolette solo dove
+        # necessarie, che il writer PyArrow non applica alle stringhe
+        pd.DataFrame(export_columns, copy=False).to_csv(csv_file, index=False, encoding='utf-8')
     print("✅ CSV anonimizzato salvato")
     
-    # Excel export
+    # Excel export (Excel non supporta datetime con fuso orario: si esportano in UTC senza tz)
+    excel_data = pd.DataFrame({
+        col: values.dt.tz_localize(None) if isinstance(values.dtype, pd.DatetimeTZDtype) else values
+        for col, values in export_columns.items()
+    }, copy=False)
     try:
-        with pd.ExcelWriter(f'{output_dir}/cybersecurity_analysis.xlsx', engine='openpyxl') as writer:
-            export_data.to_excel(writer, sheet_name='Dati Grezzi', index=False)
+        with pd.ExcelWriter(f'{output_dir}/cybersecurity_analysis.xlsx', engine='xlsxwriter') as writer:
+            excel_data.to_excel(writer, sheet_name='Dati Grezzi', index=False)
             
             # Summary sheet
             summary_data = {
@@ -624,11 +1152,11 @@ def export_data_files(data, output_dir='docs/data'):
                     'Data Ultima Analisi'
                 ],
                 'Valore': [
-                    len(data),
-                    len(data[data['Completato'].str.lower().str.contains('sì|si|yes|true', na=False)]),
-                    f"{(len(data[data['Completato'].str.lower().str.contains('sì|si|yes|true', na=False)]) / len(data) * 100):.2f}%" if len(data) > 0 else "0%",
-                    data['Dove Trovato QR'].mode().iloc[0] if 'Dove Trovato QR' in data.columns and len(data) > 0 else 'N/A',
-                    data['Fascia Età'].mode().iloc[0] if 'Fascia Età' in data.columns and len(data) > 0 else 'N/A',
+                    metrics.get('total_sessions', len(data)),
+                    metrics.get('completed_sessions', 0),
+                    f"{metrics.get('conversion_rate', 0):.2f}%",
+                    _most_frequent(metrics.get('qr_locations')),
+                    _most_frequent(metrics.get('age_distribution')),
                     datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 ]
             }
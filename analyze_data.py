@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 import sys
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from analytics_utils import (
     setup_google_sheets_connection,
     load_data_from_sheets,
+    load_cached_metrics,
+    save_cached_metrics,
     calculate_basic_metrics,
     calculate_funnel_metrics,
     calculate_location_metrics,
@@ -48,47 +52,43 @@ def main():
         # Step 3: Calcolo metriche
         print("\n📊 STEP 3: Calcolo metriche analytics")
         
-        # Calcola tutte le metriche
-        basic_metrics = calculate_basic_metrics(data)
-        funnel_metrics = calculate_funnel_metrics(data)
-        location_metrics = calculate_location_metrics(data)
-        demographic_metrics = calculate_demographic_metrics(data)
-        temporal_metrics = calculate_temporal_metrics(data)
-        
-        # Combina tutte le metriche
-        all_metrics = {
-            **basic_metrics,
-            **funnel_metrics,
-            **location_metrics,
-            **demographic_metrics,
-            **temporal_metrics
-        }
+        # Riusa le metriche se la revisione dei dati non è cambiata
+        all_metrics = load_cached_metrics(data)
+        
+        if all_metrics is None:
+            # Calcola tutte le metriche in parallelo (letture indipendenti sullo stesso DataFrame)
+            metric_functions = [
+                calculate_basic_metrics,
+                calculate_funnel_metrics,
+                calculate_location_metrics,
+                calculate_demographic_metrics,
+                calculate_temporal_metrics
+            ]
+            with ThreadPoolExecutor(max_workers=len(metric_functions)) as executor:
+                futures = [executor.submit(function, data) for function in metric_functions]
+                
+                # Vista combinata senza copiare le chiavi (le ultime metriche hanno la precedenza, come nel merge)
+                all_metrics = ChainMap(*reversed([future.result() for future in futures]))
+            save_cached_metrics(data, dict(all_metrics))
         
         print(f"✅ Metriche calcolate: {len(all_metrics)} categorie")
         
-        # Step 4: Generazione visualizzazioni
-        print("\n📈 STEP 4: Generazione grafici e visualizzazioni")
-        
-        create_conversion_charts(all_metrics)
-        print("✅ Grafici conversione generati")
-        
-        create_demographic_charts(all_metrics)
-        print("✅ Grafici demografici generati")
-        
-        create_temporal_charts(all_metrics)
-        print("✅ Grafici temporali generati")
-        
-        # Step 5: Generazione report
-        print("\n📝 STEP 5: Generazione report markdown")
-        
-        report_content = generate_markdown_report(all_metrics)
-        print("✅ Report markdown generato")
-        
-        # Step 6: Export dati
-        print("\n💾 STEP 6: Export dati in formati multipli")
-        
-        export_data_files(data)
-        print("✅ Export dati completato")
+        # Step 4-6: grafici, report ed export dipendono solo da dati e metriche
+        # e vengono eseguiti in parallelo, sovrapponendo l'I/O su disco
+        print("\n📈 STEP 4-6: Grafici, report markdown ed export dati (in parallelo)")
+        
+        output_steps = [
+            (create_conversion_charts, (all_metrics,), "✅ Grafici conversione generati"),
+            (create_demographic_charts, (all_metrics,), "✅ Grafici demografici generati"),
+            (create_temporal_charts, (all_metrics,), "✅ Grafici temporali generati"),
+            (generate_markdown_report, (all_metrics,), "✅ Report markdown generato"),
+            (export_data_files, (data, all_metrics), "✅ Export dati completato")
+        ]
+        with ThreadPoolExecutor(max_workers=len(output_steps)) as executor:
+            futures = [(executor.submit(function, *args), message) for function, args, message in output_steps]
+            for future, message in futures:
+                future.result()
+                print(message)
         
         # Step 7: Riepilogo finale
         print("\n" + "=" * 60)
@@ -96,7 +96,7 @@ def main():
         print("=" * 60)
         print("📁 File generati:")
         print("   📝 docs/analytics-report.md - Report principale")
-        print("   📊 docs/analytics/*.png - Grafici analytics")
+        print("   📊 docs/analytics/*.svg - Grafici analytics")
         print("   💾 docs/data/*.xlsx - Export Excel")
         print("   📄 docs/data/*.csv - CSV anonimizzato")
         print("=" * 60)
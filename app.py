@@ -1,8 +1,6 @@
 #!/usr/bin/env python3
 import streamlit as st
-from datetime import datetime
 from cybersecurity_utils import (
-    setup_google_sheets,
     initialize_session_state,
     track_page_opening,
     create_progress_bar,
@@ -16,11 +14,56 @@ from cybersecurity_utils import (
     create_data_download,
     display_collected_data,
     reset_session,
-    load_custom_css
+    load_base_css,
+    load_disclaimer_css
     # emergency_cleanup_sheet  # DECOMMENTARE PER PULIZIA UNA-TANTUM DEL SHEET
 )
 
 
+# Testi statici dello step 4, costruiti una sola volta all'import
+_EMAIL_NOTE_MD = """
+    **🚨 NOTA IMPORTANTE:** 
+    Ti abbiamo chiesto anche l'email! In una truffa reale, avresti fornito 
+    anche quel dato sensibile. Fortunatamente qui non l'abbiamo salvata, 
+    ma i criminali l'avrebbero usata per attacchi mirati e per campagne pubblicitarie moleste.
+    
+    **🎯 Dato Cruciale:** Anche sapere DOVE hai trovato il QR code è prezioso
+    per i truffatori - gli dice dove piazzare meglio le loro truffe!
+    
+    **📱 Tracking Nascosto:** Il tuo accesso è stato tracciato dal momento dell'apertura della pagina, PRIMA ancora che iniziassi il questionario!
+    """
+
+# Titolo e lista consigli in un unico elemento markdown
+_SECURITY_TIPS_MD = """
+    ### 🛡️ Come proteggersi:
+
+    - **NON scansionare QR code sospetti** trovati in luoghi pubblici non sicuri
+    - **Diffida dei QR su** mezzi pubblici, cassette postali, macchine
+    - **Verifica sempre la fonte** delle offerte troppo belle per essere vere
+    - **Anche solo aprire** un link sospetto può tracciare informazioni su di te o, peggio, installare malware
+    - **Non fornire mai dati personali** senza essere sicuro della fonte
+    - **Usa sempre un antivirus aggiornato** e un browser con protezioni anti-phishing
+    - **Attiva l'autenticazione a due fattori** dove possibile
+    - **Controlla sempre l'URL** del sito (https, dominio corretto)
+    - **Diffida delle urgenze** ("offerta valida solo oggi!")
+    - **QR code legittimi** sono di solito in contesti ufficiali
+    - **Chiudi immediatamente** siti sospetti, anche se sembrano professionali
+    - **Educa** familiari e colleghi su queste tecniche
+    """
+
+_TRACKED_DATA_MD = """
+    📊 **Dati tracciati in questo progetto:**
+    - **Aperture pagina:** anche chi apre e basta viene tracciato (fortunatamente qua solo con un ID anonimo)
+    - **Informazioni tecniche:** browser, ora di apertura
+    - **Punto di abbandono:** dove esci se non completi
+    - **Dati demografici:** se procedi nel questionario
+    - **Email richiesta ma NON salvata** (solo per rendere più credibile l'esperimento)
+    - Dati anonimi utilizzati per statistiche
+    
+    **🎯 Lezione fondamentale:** Anche solo APRIRE un link sospetto può essere pericoloso!
+    """
+
+
 def configure_app():
     """Configurazione iniziale dell'applicazione Streamlit"""
     st.set_page_config(
@@ -29,124 +72,130 @@ def configure_app():
         layout="centered",
         initial_sidebar_state="collapsed"
     )
-    
-    # Carica CSS personalizzato
-    load_custom_css()
 
 
+@st.fragment
 def step_1_welcome():
     """Step 1: Schermata di benvenuto e consenso"""
-    #st.markdown(" Partecipa all'estrazione di un buono Amazon.")
-    
-    #st.success("Hai la possibilità di vincere un buono Amazon.")
-    st.info("Partecipa all'estrazione di un buono Amazon dal valore di 50€")
-    
-    # Campo dove è stato trovato il QR code
-    st.markdown("📱 Dove hai trovato questo QR Code?")
-    qr_location = st.selectbox(
-        "Seleziona dove hai scansionato il codice:", 
-        get_qr_location_options()
-    )
-#prima era st.info per la privacy
-    st.markdown("""
-    **Privacy:** I tuoi dati saranno trattati in conformità al GDPR per finalità promozionali e di marketing. Potrai richiedere la cancellazione in qualsiasi momento.
-    """)
+    # Form: i widget non causano rerun finché non si preme il bottone
+    with st.form("step1_form", border=False):
+        #st.markdown(" Partecipa all'estrazione di un buono Amazon.")
+        
+        #st.success("Hai la possibilità di vincere un buono Amazon.")
+        st.info("Partecipa all'estrazione di un buono Amazon dal valore di 50€")
+        
+        # Campo dove è stato trovato il QR code
+        st.markdown("📱 Dove hai trovato questo QR Code?")
+        qr_location = st.selectbox(
+            "Seleziona dove hai scansionato il codice:", 
+            get_qr_location_options()
+        )
+    #prima era st.info per la privacy
+        st.markdown("""
+        **Privacy:** I tuoi dati saranno trattati in conformità al GDPR per finalità promozionali e di marketing. Potrai richiedere la cancellazione in qualsiasi momento.
+        """)
 
-    # Checkbox consenso
-    consent = st.checkbox("✅ Accetto il trattamento dei dati personali per partecipare all'estrazione di un buono sconto")
-    
-    # Progress bar
-    create_progress_bar(1)
-    
-    # Bottone continua
-    if st.button("Inizia Ora", type="primary", use_container_width=True):
-        # Valida dati
-        is_valid, error_msg = validate_step_data(1, qr_location=qr_location, consent=consent)
+        # Checkbox consenso
+        consent = st.checkbox("✅ Accetto il trattamento dei dati personali per partecipare all'estrazione di un buono sconto")
+        
+        # Progress bar
+        create_progress_bar(1)
+        
+        # Bottone continua
+        if st.form_submit_button("Inizia Ora", type="primary", use_container_width=True):
+            # Valida dati
+            is_valid, error_msg = validate_step_data(1, qr_location=qr_location, consent=consent)
         
-        if is_valid:
-            # Salva dati step 1
-            sheet = setup_google_sheets()
-            save_step_data(1, sheet, qr_location=qr_location)
+            if is_valid:
+                # Salva dati step 1
+                save_step_data(1, qr_location=qr_location)
             
-            # Vai al prossimo step
-            st.session_state.step = 2
-            st.rerun()
-        else:
-            st.error(error_msg)
+                # Vai al prossimo step
+                st.session_state.step = 2
+                st.rerun()
+            else:
+                st.error(error_msg)
 
 
+@st.fragment
 def step_2_personal_info():
     """Step 2: Informazioni personali"""
-    #st.markdown("## 📋 Informazioni 
-    st.markdown("📋 Informazioni Personali")
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        age_range = st.selectbox("Fascia d'età:", get_age_ranges())
+    # Form: i widget non causano rerun finché non si preme il bottone
+    with st.form("step2_form", border=False):
+        #st.markdown("## 📋 Informazioni 
+        st.markdown("📋 Informazioni Personali")
+        col1, col2 = st.columns(2)
         
-    with col2:
-        gender = st.selectbox("Sesso:", get_gender_options())
-    
-    birth_province = st.selectbox("Provincia di nascita:", get_province_list())
+        with col1:
+            age_range = st.selectbox("Fascia d'età:", get_age_ranges())
+        
+        with col2:
+            gender = st.selectbox("Sesso:", get_gender_options())
+        
+        birth_province = st.selectbox("Provincia di nascita:", get_province_list())
 
-    education = st.selectbox("Titolo di studio:", get_education_levels())
-    
-    # Progress bar
-    create_progress_bar(2)
-    
-    # Bottone continua
-    if st.button("Continua", type="primary", use_container_width=True):
-        # Valida dati
-        is_valid, error_msg = validate_step_data(
-            2, age_range=age_range, gender=gender, birth_province=birth_province, education=education
-        )
+        education = st.selectbox("Titolo di studio:", get_education_levels())
+        
+        # Progress bar
+        create_progress_bar(2)
+        
+        # Bottone continua
+        if st.form_submit_button("Continua", type="primary", use_container_width=True):
+            # Valida dati
+            is_valid, error_msg = validate_step_data(
+                2, age_range=age_range, gender=gender, birth_province=birth_province, education=education
+            )
         
-        if is_valid:
-            # Salva dati step 2
-            sheet = setup_google_sheets()
-            save_step_data(2, sheet, age_range=age_range, gender=gender, 
-                           birth_province=birth_province, education=education)
+            if is_valid:
+                # Salva dati step 2
+                save_step_data(2, age_range=age_range, gender=gender, 
+                               birth_province=birth_province, education=education)
             
-            # Vai al prossimo step
-            st.session_state.step = 3
-            st.rerun()
-        else:
-            st.error(error_msg)
+                # Vai al prossimo step
+                st.session_state.step = 3
+                st.rerun()
+            else:
+                st.error(error_msg)
 
 
+@st.fragment
 def step_3_final_confirmation():
     """Step 3: Conferma finale"""
-    st.markdown("💳 Inserisci la tua mail per vedere se hai vinto")
-    
-    #st.info("📧 Inserisci la tua email per ricevere l'eventuale buono")
-    
-    # Email richiesta ma NON salvata (solo per l'effetto della demo)
-    email_input = st.text_input("Email:")
-    
-    #st.success("Prosegui per vedere se hai vinto.")
-    
-    # Progress bar
-    create_progress_bar(3)
-    
-    # Bottone finale
-    if st.button("Continua", type="primary", use_container_width=True):
-        # Valida email
-        is_valid, error_msg = validate_step_data(3, email_input=email_input)
+    # Form: i widget non causano rerun finché non si preme il bottone
+    with st.form("step3_form", border=False):
+        st.markdown("💳 Inserisci la tua mail per vedere se hai vinto")
+        
+        #st.info("📧 Inserisci la tua email per ricevere l'eventuale buono")
         
-        if is_valid:
-            # Salva completamento finale (email NON salvata)
-            sheet = setup_google_sheets()
-            save_step_data(3, sheet)
+        # Email richiesta ma NON salvata (solo per l'effetto della demo)
+        email_input = st.text_input("Email:")
+        
+        #st.success("Prosegui per vedere se hai vinto.")
+        
+        # Progress bar
+        create_progress_bar(3)
+        
+        # Bottone finale
+        if st.form_submit_button("Continua", type="primary", use_container_width=True):
+            # Valida email
+            is_valid, error_msg = validate_step_data(3, email_input=email_input)
+        
+            if is_valid:
+                # Salva completamento finale (email NON salvata)
+                save_step_data(3)
             
-            # Vai al disclaimer
-            st.session_state.step = 4
-            st.rerun()
-        else:
-            st.error(error_msg)
+                # Vai al disclaimer
+                st.session_state.step = 4
+                st.rerun()
+            else:
+                st.error(error_msg)
 
 
+@st.fragment
 def step_4_educational_disclaimer():
     """Step 4: Disclaimer educativo finale"""
+    load_disclaimer_css()
+    
     #st.markdown('<div class="warning-box">', unsafe_allow_html=True)
     st.markdown("# ⚠️ Questo è un esperimento. Ma in un altro contesto, avrebbero potuto truffarti.")
     #st.markdown("</div>", unsafe_allow_html=True)
@@ -158,61 +207,35 @@ def step_4_educational_disclaimer():
     st.markdown('<div class="data-collected">', unsafe_allow_html=True)
     st.markdown("### 📊 Dati che hai condiviso:")
     
-    data_df = display_collected_data(st.session_state.user_data)
-    st.dataframe(data_df, use_container_width=True)
+    # Tabella costruita una sola volta: i dati raccolti non cambiano più allo step 4
+    if 'collected_data_rows' not in st.session_state:
+        st.session_state.collected_data_rows = display_collected_data(st.session_state.user_data)
+    st.dataframe(st.session_state.collected_data_rows, use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
     
-    st.warning("""
-    **🚨 NOTA IMPORTANTE:** 
-    Ti abbiamo chiesto anche l'email! In una truffa reale, avresti fornito 
-    anche quel dato sensibile. Fortunatamente qui non l'abbiamo salvata, 
-    ma i criminali l'avrebbero usata per attacchi mirati e per campagne pubblicitarie moleste.
-    
-    **🎯 Dato Cruciale:** Anche sapere DOVE hai trovato il QR code è prezioso
-    per i truffatori - gli dice dove piazzare meglio le loro truffe!
-    
-    **📱 Tracking Nascosto:** Il tuo accesso è stato tracciato dal momento dell'apertura della pagina, PRIMA ancora che iniziassi il questionario!
-    """)
+    st.warning(_EMAIL_NOTE_MD)
     
     # Consigli di sicurezza
-    st.markdown("### 🛡️ Come proteggersi:")
-    st.markdown("""
-    - **NON scansionare QR code sospetti** trovati in luoghi pubblici non sicuri
-    - **Diffida dei QR su** mezzi pubblici, cassette postali, macchine
-    - **Verifica sempre la fonte** delle offerte troppo belle per essere vere
-    - **Anche solo aprire** un link sospetto può tracciare informazioni su di te o, peggio, installare malware
-    - **Non fornire mai dati personali** senza essere sicuro della fonte
-    - **Usa sempre un antivirus aggiornato** e un browser con protezioni anti-phishing
-    - **Attiva l'autenticazione a due fattori** dove possibile
-    - **Controlla sempre l'URL** del sito (https, dominio corretto)
-    - **Diffida delle urgenze** ("offerta valida solo oggi!")
-    - **QR code legittimi** sono di solito in contesti ufficiali
-    - **Chiudi immediatamente** siti sospetti, anche se sembrano professionali
-    - **Educa** familiari e colleghi su queste tecniche
-    """)
+    st.markdown(_SECURITY_TIPS_MD)
     
     st.error("**Ricorda:** i cybercriminali utilizzano proprio queste tecniche per rubare identità, soldi e dati personali!")
     
-    st.info("""
-    📊 **Dati tracciati in questo progetto:**
-    - **Aperture pagina:** anche chi apre e basta viene tracciato (fortunatamente qua solo con un ID anonimo)
-    - **Informazioni tecniche:** browser, ora di apertura
-    - **Punto di abbandono:** dove esci se non completi
-    - **Dati demografici:** se procedi nel questionario
-    - **Email richiesta ma NON salvata** (solo per rendere più credibile l'esperimento)
-    - Dati anonimi utilizzati per statistiche
-    
-    **🎯 Lezione fondamentale:** Anche solo APRIRE un link sospetto può essere pericoloso!
-    """)
+    st.info(_TRACKED_DATA_MD)
 
     st.markdown("**Progetto Educativo di Cybersicurezza** - Utilizzato esclusivamente per scopi didattici")
     
-    # Download dei dati
-    json_data = create_data_download(st.session_state.user_data)
+    # Download dei dati (JSON serializzato una sola volta: i dati non cambiano più allo step 4)
+    if 'report_json' not in st.session_state:
+        st.session_state.report_json = create_data_download(st.session_state.user_data)
+    # Nome file fissato all'ingresso nello step 4: resta stabile tra i rerun
+    if 'report_filename' not in st.session_state:
+        # Import locale: in app.py datetime serve solo qui (il modulo è già caricato da cybersecurity_utils)
+        from datetime import datetime
+        st.session_state.report_filename = f"cybersecurity_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
     st.download_button(
         label="📥 Scarica Report Dati Raccolti",
-        data=json_data,
-        file_name=f"cybersecurity_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+        data=st.session_state.report_json,
+        file_name=st.session_state.report_filename,
         mime="application/json"
     )
     
@@ -224,20 +247,27 @@ def step_4_educational_disclaimer():
 
 def main():
     """Funzione principale dell'applicazione"""
-    # Configurazione app
-    configure_app()
+    # Configurazione app una sola volta per sessione (il frontend mantiene la page config)
+    if not st.session_state.get('_configured'):
+        configure_app()
+        st.session_state._configured = True
+    
+    # CSS comune: va emesso a ogni rerun, altrimenti Streamlit lo rimuove
+    load_base_css()
     
     # Inizializzazione session state
     initialize_session_state()
     
     # Tracking apertura pagina con FILTRO ANTI-HEALTH CHECK FINALE
     # (Il debug finale è integrato nella funzione se DEBUG_MODE=true)
+    # Una sola volta per sessione: i rerun successivi non rileggono header né scrivono
     track_page_opening()
     
     # DECOMMENTARE LA RIGA SOTTO PER PULIZIA UNA-TANTUM DEL GOOGLE SHEET ROVINATO
     # emergency_cleanup_sheet()  # USARE UNA VOLTA SOLA, POI RICOMMENTARE
     
-    # Router per i diversi step
+    # Router per i diversi step: ogni step è un fragment, le interazioni con i widget
+    # rieseguono solo lo step corrente; i cambi di step usano st.rerun() sull'intera app
     if st.session_state.step == 1:
         step_1_welcome()
     elif st.session_state.step == 2:
@@ -1,11 +1,231 @@
 #!/usr/bin/env python3
 import streamlit as st
-import pandas as pd
+import functools
 import json
+import logging
 from datetime import datetime
-import gspread
-from google.oauth2.service_account import Credentials
 import os
+import queue
+import random
+import re
+import threading
+import time
+import uuid
+
+
+def _completed_label(value):
+    """Converte il flag di completamento nel valore della colonna Completato"""
+    return 'Sì' if value else 'No'
+
+
+# Colonne della sessione: (header, chiave in user_data, conversione opzionale)
+_SESSION_COLUMNS = (
+    ('Session_ID', 'session_id', None),
+    ('Timestamp_Apertura', 'page_open_timestamp', None),
+    ('Timestamp_Inizio_Form', 'form_started_timestamp', None),
+    ('Timestamp_Step2', 'step2_timestamp', None),
+    ('Timestamp_Completamento', 'completion_timestamp', None),
+    ('Dove_Trovato_QR', 'qr_location', None),
+    ('Fascia_Eta', 'age_range', None),
+    ('Sesso', 'gender', None),
+    ('Provincia_Nascita', 'birth_province', None),
+    ('Titolo_Studio', 'education', None),
+    ('Status_Finale', 'status', None),
+    ('Completato', 'completed', _completed_label),
+    ('User_Agent', 'user_agent', None)
+)
+
+# Header fissi che NON cambiano mai (struttura a 14 colonne del Google Sheet, tupla immutabile)
+_FIXED_HEADERS = tuple(header for header, _, _ in _SESSION_COLUMNS) + ('Data_Creazione',)
+
+
+# Formati data usati per Data_Creazione e per il prefisso leggibile del Session_ID
+_CREATED_FORMAT = '%Y-%m-%d %H:%M:%S'
+_SESSION_ID_FORMAT = '%Y%m%d_%H%M%S'
+
+
+# Modalità debug, letta una sola volta all'import
+_DEBUG = os.getenv("DEBUG_MODE", "").lower() == "true"
+
+# Log degli errori Google Sheets in debug: le scritture girano nel thread in
+# background, dove st.error non ha una pagina su cui comparire
+logger = logging.getLogger(__name__)
+
+
+# Codici HTTP delle risposte Google API che vale la pena ritentare
+_RETRY_STATUS_CODES = (429, 500, 503)
+
+# Riga del sheet già assegnata a ogni sessione (Session_ID -> numero di riga):
+# scritta dal thread in background, evita di rileggere il sheet a ogni salvataggio
+# (limitato: le sessioni abbandonate più vecchie vengono scartate e, se tornano,
+# ritrovate con una lettura della colonna Session_ID)
+_SESSION_ROWS = {}
+_SESSION_ROWS_LOCK = threading.Lock()
+_SESSION_ROWS_MAX = 10000
+
+
+def retry_with_backoff(max_attempts=5, base=0.5):
+    """
+    Decoratore: ritenta la funzione sugli errori API transitori (429/500/503)
+    con backoff esponenziale e jitter
+    
+    Args:
+        max_attempts (int): Numero massimo di tentativi
+        base (float): Attesa iniziale in secondi, raddoppiata a ogni tentativo
+        
+    Returns:
+        callable: Decoratore
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            from gspread.exceptions import APIError
+            
+            for attempt in range(max_attempts):
+                try:
+                    return func(*args, **kwargs)
+                except APIError as e:
+                    if e.response.status_code not in _RETRY_STATUS_CODES or attempt == max_attempts - 1:
+                        raise
+                    time.sleep(base * 2 ** attempt + random.random())
+        return wrapper
+    return decorator
+
+
+# Chiavi accettate per lo sheet_id nei secrets, in ordine di priorità
+_SHEET_ID_KEYS = ("GOOGLE_SHEET_ID", "sheet_id", "google_sheet_id")
+_SERVICE_ACCOUNT_SHEET_ID_KEYS = ("sheet_id", "GOOGLE_SHEET_ID")
+
+
+def _has_secrets_service_account():
+    """
+    Verifica se i secrets contengono il service account, senza sollevare eccezioni
+    
+    Senza alcun secrets.toml, `in st.secrets` solleva StreamlitSecretNotFoundError
+    (sottoclasse di FileNotFoundError): in quel caso si passa alle altre sorgenti.
+    
+    Returns:
+        bool: True se è presente la sezione gcp_service_account
+    """
+    try:
+        return "gcp_service_account" in st.secrets
+    except FileNotFoundError:
+        return False
+
+
+@functools.lru_cache(maxsize=1)
+def _env_service_account_info():
+    """
+    Costruisce una sola volta per processo le info del service account dalle variabili d'ambiente
+    
+    Returns:
+        dict: Info service account (chiave privata con i newline ripristinati)
+    """
+    return {
+        "type": "service_account",
+        "project_id": os.getenv("GOOGLE_PROJECT_ID"),
+        "private_key_id": os.getenv("GOOGLE_PRIVATE_KEY_ID"),
+        "private_key": os.getenv("GOOGLE_PRIVATE_KEY", "").replace('\\n', '\n'),
+        "client_email": os.getenv("GOOGLE_CLIENT_EMAIL"),
+        "client_id": os.getenv("GOOGLE_CLIENT_ID"),
+        "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+        "token_uri": "https://oauth2.googleapis.com/token",
+        "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
+        "client_x509_cert_url": f"https://www.googleapis.com/robot/v1/metadata/x509/{os.getenv('GOOGLE_CLIENT_EMAIL', '').replace('@', '%40')}"
+    }
+
+
+@functools.lru_cache(maxsize=1)
+def _load_config():
+    """
+    Legge config.json una sola volta per processo (il file non cambia a runtime)
+    
+    Returns:
+        dict: Configurazione
+    """
+    with open("config.json", "r") as f:
+        return json.load(f)
+
+
+@st.cache_resource(show_spinner=False)
+@retry_with_backoff()
+def _open_google_sheet():
+    """
+    Autentica e apre il Google Sheet una sola volta per processo
+    
+    Il risultato (client e worksheet) è condiviso tra rerun e sessioni.
+    Le eccezioni non vengono messe in cache: al rerun successivo si ritenta.
+    
+    Returns:
+        gspread.Worksheet or None: Sheet object, None se mancano le credenziali
+    """
+    # Import pesanti caricati solo quando serve davvero la connessione
+    import gspread
+    from google.auth.transport.requests import AuthorizedSession
+    from google.oauth2.service_account import Credentials
+    from requests.adapters import HTTPAdapter
+    
+    scope = [
+        "https://spreadsheets.google.com/feeds",
+        "https://www.googleapis.com/auth/drive"
+    ]
+    
+    # PRIORITÀ 1: Streamlit Secrets (Production) - SILENZIOSO
+    if _has_secrets_service_account():
+        service_account = st.secrets["gcp_service_account"]
+        creds = Credentials.from_service_account_info(service_account, scopes=scope)
+        # Supporta tutti i formati per sheet_id (primo valore non vuoto)
+        sheet_id = next(
+            (
+                value for value in (
+                    *(st.secrets.get(key) for key in _SHEET_ID_KEYS),
+                    *(service_account.get(key) for key in _SERVICE_ACCOUNT_SHEET_ID_KEYS)
+                )
+                if value
+            ),
+            ""
+        )
+        
+    # PRIORITÀ 2: Variabili d'Ambiente - SILENZIOSO
+    elif os.getenv("GOOGLE_PROJECT_ID"):
+        creds = Credentials.from_service_account_info(_env_service_account_info(), scopes=scope)
+        sheet_id = os.getenv("GOOGLE_SHEET_ID", "")
+        
+    # PRIORITÀ 3: File JSON locale (Development) - SILENZIOSO
+    elif os.path.exists("credentials.json"):
+        creds = Credentials.from_service_account_file("credentials.json", scopes=scope)
+        sheet_id = os.getenv("GOOGLE_SHEET_ID", "DEFAULT_SHEET_ID")
+        
+    # PRIORITÀ 4: File config.json - SILENZIOSO
+    elif os.path.exists("config.json"):
+        config = _load_config()
+        creds = Credentials.from_service_account_info(
+            config["google_sheets"]["service_account"], 
+            scopes=scope
+        )
+        sheet_id = config["google_sheets"]["sheet_id"]
+        
+    else:
+        # FALLBACK SILENZIOSO - nessun warning
+        return None
+        
+    # Verifica sheet_id SILENZIOSAMENTE
+    if not sheet_id or sheet_id == "DEFAULT_SHEET_ID":
+        return None
+        
+    # Connetti SILENZIOSAMENTE, con un pool di connessioni keep-alive condiviso
+    # da tutte le chiamate API del processo (il client resta in cache)
+    session = AuthorizedSession(creds)
+    session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=10))
+    client = gspread.Client(auth=creds, session=session)
+    sheet = client.open_by_key(sheet_id).sheet1
+    
+    # Struttura verificata una sola volta per processo (basta la riga degli header);
+    # se fallisce l'eccezione non viene messa in cache e si ritenta al rerun successivo
+    if not initialize_google_sheet_structure(sheet, [sheet.row_values(1)]):
+        raise RuntimeError("Struttura del Google Sheet non inizializzabile")
+    
+    return sheet
 
 
 def setup_google_sheets():
@@ -17,187 +237,274 @@ def setup_google_sheets():
         gspread.Worksheet or None: Sheet object se successo, None se errore
     """
     try:
-        scope = [
-            "https://spreadsheets.google.com/feeds",
-            "https://www.googleapis.com/auth/drive"
-        ]
-        
-        # PRIORITÀ 1: Streamlit Secrets (Production) - SILENZIOSO
-        if "gcp_service_account" in st.secrets:
-            creds = Credentials.from_service_account_info(
-                st.secrets["gcp_service_account"], 
-                scopes=scope
-            )
-            # Supporta tutti i formati per sheet_id
-            sheet_id = (
-                st.secrets.get("GOOGLE_SHEET_ID", "") or 
-                st.secrets.get("sheet_id", "") or
-                st.secrets.get("google_sheet_id", "") or
-                st.secrets.get("gcp_service_account", {}).get("sheet_id", "") or
-                st.secrets.get("gcp_service_account", {}).get("GOOGLE_SHEET_ID", "")
-            )
-            
-        # PRIORITÀ 2: Variabili d'Ambiente - SILENZIOSO
-        elif os.getenv("GOOGLE_PROJECT_ID"):
-            service_account_info = {
-                "type": "service_account",
-                "project_id": os.getenv("GOOGLE_PROJECT_ID"),
-                "private_key_id": os.getenv("GOOGLE_PRIVATE_KEY_ID"),
-                "private_key": os.getenv("GOOGLE_PRIVATE_KEY", "").replace('\\n', '\n'),
-                "client_email": os.getenv("GOOGLE_CLIENT_EMAIL"),
-                "client_id": os.getenv("GOOGLE_CLIENT_ID"),
-                "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                "token_uri": "https://oauth2.googleapis.com/token",
-                "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
-                "client_x509_cert_url": f"https://www.googleapis.com/robot/v1/metadata/x509/{os.getenv('GOOGLE_CLIENT_EMAIL', '').replace('@', '%40')}"
-            }
-            creds = Credentials.from_service_account_info(service_account_info, scopes=scope)
-            sheet_id = os.getenv("GOOGLE_SHEET_ID", "")
-            
-        # PRIORITÀ 3: File JSON locale (Development) - SILENZIOSO
-        elif os.path.exists("credentials.json"):
-            creds = Credentials.from_service_account_file("credentials.json", scopes=scope)
-            sheet_id = os.getenv("GOOGLE_SHEET_ID", "DEFAULT_SHEET_ID")
-            
-        # PRIORITÀ 4: File config.json - SILENZIOSO
-        elif os.path.exists("config.json"):
-            with open("config.json", "r") as f:
-                config = json.load(f)
-            creds = Credentials.from_service_account_info(
-                config["google_sheets"]["service_account"], 
-                scopes=scope
-            )
-            sheet_id = config["google_sheets"]["sheet_id"]
-            
-        else:
-            # FALLBACK SILENZIOSO - nessun warning
-            return None
-            
-        # Verifica sheet_id SILENZIOSAMENTE
-        if not sheet_id or sheet_id == "DEFAULT_SHEET_ID":
-            return None
-            
-        # Connetti SILENZIOSAMENTE
-        client = gspread.authorize(creds)
-        sheet = client.open_by_key(sheet_id).sheet1
-        
-        return sheet
+        return _open_google_sheet()
         
     except Exception as e:
         # Errori SILENZIOSI - solo se in debug mode
-        if os.getenv("DEBUG_MODE", "").lower() == "true":
-            st.error(f"Debug: Errore Google Sheets: {e}")
+        if _DEBUG:
+            logger.error("Debug: Errore Google Sheets: %s", e)
         return None
 
 
-def initialize_google_sheet_structure(sheet):
+def _has_fixed_headers(existing_data):
+    """Verifica che la prima riga del sheet corrisponda agli header fissi"""
+    return bool(existing_data) and tuple(existing_data[0]) == _FIXED_HEADERS
+
+
+def _reset_sheet_headers(sheet):
+    """
+    Svuota il sheet e riscrive gli header fissi con una sola richiesta batchUpdate
+    
+    Args:
+        sheet: Google Sheet object
+    """
+    sheet.spreadsheet.batch_update({
+        'requests': [
+            # Cancella tutti i valori (la formattazione resta, come con sheet.clear())
+            {'updateCells': {'range': {'sheetId': sheet.id}, 'fields': 'userEnteredValue'}},
+            # Scrive gli header nella prima riga
+            {'updateCells': {
+                'start': {'sheetId': sheet.id, 'rowIndex': 0, 'columnIndex': 0},
+                'rows': [{'values': [{'userEnteredValue': {'stringValue': header}} for header in _FIXED_HEADERS]}],
+                'fields': 'userEnteredValue'
+            }}
+        ]
+    })
+    
+    # Le righe memorizzate per le sessioni non esistono più
+    with _SESSION_ROWS_LOCK:
+        _SESSION_ROWS.clear()
+
+
+def initialize_google_sheet_structure(sheet, existing_data=None):
     """
     Inizializza la struttura fissa del Google Sheet con header predefiniti
+    
+    Args:
+        sheet: Google Sheet object
+        existing_data (list): Contenuto già letto del sheet, evita una seconda lettura
     """
     try:
-        # Header fissi che NON cambiano mai
-        FIXED_HEADERS = [
-            'Session_ID',
-            'Timestamp_Apertura', 
-            'Timestamp_Inizio_Form',
-            'Timestamp_Step2',
-            'Timestamp_Completamento',
-            'Dove_Trovato_QR',
-            'Fascia_Eta',
-            'Sesso', 
-            'Provincia_Nascita',
-            'Titolo_Studio',
-            'Status_Finale',
-            'Completato',
-            'User_Agent',
-            'Data_Creazione'
-        ]
-        
         # Verifica se il sheet è vuoto o ha struttura sbagliata
         try:
-            existing_data = sheet.get_all_values()
+            if existing_data is None:
+                existing_data = sheet.get_all_values()
             
             # Se è vuoto o la prima riga non corrisponde agli header, resetta
-            if (not existing_data or 
-                len(existing_data) == 0 or 
-                existing_data[0] != FIXED_HEADERS):
+            if not _has_fixed_headers(existing_data):
                 
                 # Pulisce tutto e ricrea con header fissi
-                sheet.clear()
-                sheet.append_row(FIXED_HEADERS)
+                _reset_sheet_headers(sheet)
                 
         except Exception:
             # Se c'è qualsiasi errore, ricrea da zero
-            sheet.clear()
-            sheet.append_row(FIXED_HEADERS)
+            _reset_sheet_headers(sheet)
             
         return True
         
     except Exception as e:
-        if os.getenv("DEBUG_MODE", "").lower() == "true":
-            st.error(f"Debug: Errore inizializzazione: {e}")
+        if _DEBUG:
+            logger.error("Debug: Errore inizializzazione: %s", e)
         return False
 
 
-def save_to_google_sheets_fixed(data, sheet):
+def _build_session_row(data, created):
     """
-    Salva dati con struttura FISSA e CONSISTENTE - sempre 14 colonne
+    Prepara la riga della sessione con struttura FISSA (sempre 14 colonne)
+    
+    Args:
+        data (dict): Dati sessione
+        created (str): Data_Creazione già formattata
+        
+    Returns:
+        list: Valori nell'ordine di _FIXED_HEADERS
     """
-    try:
-        if not sheet:
-            return False
-            
-        # Inizializza struttura se necessario
-        if not initialize_google_sheet_structure(sheet):
-            return False
+    return [
+        data.get(key, '') if convert is None else convert(data.get(key))
+        for _, key, convert in _SESSION_COLUMNS
+    ] + [created]                                        # Data_Creazione
+
+
+@retry_with_backoff()
+def _write_session_rows(batch, sheet):
+    """
+    Scrive (o aggiorna) le righe di un gruppo di salvataggi; gli errori API transitori vengono ritentati
+    
+    Gli header sono già verificati all'apertura del sheet (_open_google_sheet).
+    Per ogni sessione conta solo l'ultimo salvataggio del gruppo (i dati sono
+    cumulativi); le sessioni nuove vengono aggiunte con un solo append_rows.
+    La riga di ogni sessione viene ricordata dopo l'append e, prima di
+    sovrascriverla, se ne rilegge solo la cella Session_ID; la colonna intera
+    viene letta solo se qualche riga non è nota o non corrisponde più, quindi un
+    retry dopo un append riuscito (ma senza risposta) trova le righe invece di
+    duplicarle.
+    
+    Args:
+        batch (list): Dati sessione in ordine di arrivo
+        sheet: Google Sheet object
         
-        # Struttura FISSA dei dati (sempre uguale)
-        session_id = data.get('session_id', '')
-        
-        # Prepara riga con struttura FISSA (sempre 14 colonne)
-        fixed_row = [
-            session_id,                                      # Session_ID
-            data.get('page_open_timestamp', ''),             # Timestamp_Apertura
-            data.get('form_started_timestamp', ''),          # Timestamp_Inizio_Form  
-            data.get('step2_timestamp', ''),                 # Timestamp_Step2
-            data.get('completion_timestamp', ''),            # Timestamp_Completamento
-            data.get('qr_location', ''),                     # Dove_Trovato_QR
-            data.get('age_range', ''),                       # Fascia_Eta
-            data.get('gender', ''),                          # Sesso
-            data.get('birth_province', ''),                  # Provincia_Nascita
-            data.get('education', ''),                       # Titolo_Studio
-            data.get('status', ''),                          # Status_Finale
-            'Sì' if data.get('completed') else 'No',        # Completato
-            data.get('user_agent', ''),                      # User_Agent
-            datetime.now().strftime('%Y-%m-%d %H:%M:%S')     # Data_Creazione
-        ]
+    Returns:
+        bool: True se salvato
+    """
+    from gspread.utils import InsertDataOption, ValueInputOption, a1_to_rowcol, rowcol_to_a1
+    
+    # Ultimo stato di ogni sessione, nell'ordine della prima comparsa
+    latest = {}
+    for data in batch:
+        latest[data.get('session_id', '')] = data
+    # Un solo orario di creazione per tutto il gruppo
+    created = datetime.now().strftime(_CREATED_FORMAT)
+    rows = {session_id: _build_session_row(data, created) for session_id, data in latest.items()}
+    
+    # Righe già note: i dati di sessione sono cumulativi, quindi la nuova riga
+    # contiene già tutti i valori scritti in precedenza e può sovrascriverla
+    with _SESSION_ROWS_LOCK:
+        row_indexes = {session_id: _SESSION_ROWS[session_id] for session_id in rows if session_id in _SESSION_ROWS}
+    
+    if row_indexes:
+        # Verifica che la colonna A contenga ancora la stessa sessione (una sola lettura
+        # delle celle interessate): se il sheet è stato ordinato o modificato a mano,
+        # la riga viene ricercata invece di sovrascrivere un'altra sessione
+        cells = sheet.batch_get([rowcol_to_a1(row_index, 1) for row_index in row_indexes.values()])
+        for session_id, cell in zip(list(row_indexes), cells):
+            if cell.first() != session_id:
+                del row_indexes[session_id]
+    
+    if len(row_indexes) < len(rows):
+        # Cerca le sessioni non note nella sola colonna Session_ID (una lettura per gruppo)
+        session_ids = sheet.col_values(1)
         
-        # Cerca se esiste già una riga per questa sessione
-        all_data = sheet.get_all_values()
-        existing_row_index = None
+        for i, session_id in enumerate(session_ids[1:], start=2):  # Skip header
+            if session_id in rows and session_id not in row_indexes:
+                row_indexes[session_id] = i
+    
+    if row_indexes:
+        # AGGIORNA righe esistenti con un solo range A:N ciascuna, tutte in una richiesta
+        sheet.batch_update(
+            [
+                {
+                    'range': f"{rowcol_to_a1(row_index, 1)}:{rowcol_to_a1(row_index, len(_FIXED_HEADERS))}",
+                    'values': [rows[session_id]]
+                }
+                for session_id, row_index in row_indexes.items()
+            ],
+            value_input_option=ValueInputOption.user_entered
+        )
+    
+    new_sessions = [session_id for session_id in rows if session_id not in row_indexes]
+    if new_sessions:
+        # AGGIUNGI nuove righe - sempre 14 colonne, una sola richiesta per tutte
+        # (INSERT_ROWS: values.append inserisce righe nuove, non sovrascrive celle vuote)
+        response = sheet.append_rows(
+            [rows[session_id] for session_id in new_sessions],
+            value_input_option=ValueInputOption.raw,
+            insert_data_option=InsertDataOption.insert_rows
+        )
         
-        for i, row in enumerate(all_data[1:], start=2):  # Skip header
-            if len(row) > 0 and row[0] == session_id:
-                existing_row_index = i
-                break
+        # updatedRange (es. "'Foglio1'!A5:N7") indica la prima riga scritta
+        updated_range = response['updates']['updatedRange']
+        first_row = a1_to_rowcol(updated_range.split('!')[-1].split(':')[0])[0]
+        for offset, session_id in enumerate(new_sessions):
+            row_indexes[session_id] = first_row + offset
+    
+    with _SESSION_ROWS_LOCK:
+        for session_id, row_index in row_indexes.items():
+            if latest[session_id].get('completed'):
+                # Sessione completata: non ci saranno altre scritture
+                _SESSION_ROWS.pop(session_id, None)
+            else:
+                _SESSION_ROWS[session_id] = row_index
         
-        if existing_row_index:
-            # AGGIORNA riga esistente - mantiene sempre 14 colonne
-            for col_index, value in enumerate(fixed_row, start=1):
-                if value:  # Aggiorna solo se c'è un valore
-                    sheet.update_cell(existing_row_index, col_index, value)
-        else:
-            # AGGIUNGI nuova riga - sempre 14 colonne
-            sheet.append_row(fixed_row)
+        # Scarta le voci inserite per prime (i dict mantengono l'ordine di inserimento)
+        while len(_SESSION_ROWS) > _SESSION_ROWS_MAX:
+            del _SESSION_ROWS[next(iter(_SESSION_ROWS))]
+    
+    return True
+
+
+def _save_session_batch(batch, sheet):
+    """
+    Salva un gruppo di dati sessione, senza propagare gli errori
+    
+    Args:
+        batch (list): Dati sessione in ordine di arrivo
+        sheet: Google Sheet object
         
-        return True
+    Returns:
+        bool: True se salvato
+    """
+    try:
+        if not sheet:
+            return False
+            
+        return _write_session_rows(batch, sheet)
         
     except Exception as e:
-        if os.getenv("DEBUG_MODE", "").lower() == "true":
-            st.error(f"Debug: Errore salvataggio: {e}")
+        if _DEBUG:
+            logger.error("Debug: Errore salvataggio: %s", e)
         return False
 
 
+def save_to_google_sheets_fixed(data, sheet):
+    """
+    Salva dati con struttura FISSA e CONSISTENTE - sempre 14 colonne
+    """
+    return _save_session_batch([data], sheet)
+
+
+def _sheet_writer(write_queue):
+    """
+    Worker in background: esegue le scritture su Google Sheets in ordine di arrivo
+    
+    Il sheet viene aperto qui, non nel thread dell'interfaccia: la prima apertura
+    (autenticazione e open_by_key) avviene mentre l'utente vede già il form.
+    Le richieste già in coda vengono raccolte e salvate insieme, così più
+    sessioni nuove finiscono in un solo append_rows.
+    
+    Args:
+        write_queue (queue.Queue): Coda dei dati sessione
+    """
+    while True:
+        pending = [write_queue.get()]
+        while True:
+            try:
+                pending.append(write_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        try:
+            _save_session_batch(pending, setup_google_sheets())
+        finally:
+            for _ in pending:
+                write_queue.task_done()
+
+
+@st.cache_resource(show_spinner=False)
+def _get_write_queue():
+    """
+    Crea (una sola volta per processo) la coda di scrittura e il thread che la consuma
+    
+    Un solo worker mantiene l'ordine delle scritture: l'aggiornamento di uno step
+    trova sempre la riga creata dall'apertura pagina della stessa sessione.
+    
+    Returns:
+        queue.Queue: Coda condivisa delle scritture
+    """
+    write_queue = queue.Queue()
+    threading.Thread(target=_sheet_writer, args=(write_queue,), name="sheets-writer", daemon=True).start()
+    return write_queue
+
+
+def queue_sheet_write(data):
+    """
+    Accoda il salvataggio dei dati senza bloccare l'interfaccia
+    
+    Args:
+        data (dict): Dati sessione (ne viene salvata una copia)
+    """
+    _get_write_queue().put(dict(data))
+
+
 def emergency_cleanup_sheet():
     """
     FUNZIONE TEMPORANEA - Pulisce completamente il Google Sheet rovinato
@@ -206,27 +513,8 @@ def emergency_cleanup_sheet():
     sheet = setup_google_sheets()
     if sheet:
         try:
-            # PULISCE TUTTO
-            sheet.clear()
-            
-            # RICREA HEADER FISSI
-            FIXED_HEADERS = [
-                'Session_ID',
-                'Timestamp_Apertura', 
-                'Timestamp_Inizio_Form',
-                'Timestamp_Step2',
-                'Timestamp_Completamento',
-                'Dove_Trovato_QR',
-                'Fascia_Eta',
-                'Sesso', 
-                'Provincia_Nascita',
-                'Titolo_Studio',
-                'Status_Finale',
-                'Completato',
-                'User_Agent',
-                'Data_Creazione'
-            ]
-            sheet.append_row(FIXED_HEADERS)
+            # PULISCE TUTTO E RICREA HEADER FISSI (una sola richiesta)
+            _reset_sheet_headers(sheet)
             
             st.success("✅ Google Sheet ripulito e ricreato con struttura corretta!")
             st.info("🗑️ RIMUOVI questa funzione dal codice dopo l'uso!")
@@ -237,32 +525,79 @@ def emergency_cleanup_sheet():
         st.warning("Impossibile connettersi al Google Sheet per la pulizia")
 
 
+# Province italiane + Estero: tupla immutabile creata una sola volta all'import
+PROVINCE_LIST = (
+    "","Estero", "Agrigento", "Alessandria", "Ancona", "Aosta", "Arezzo", "Ascoli Piceno", 
+    "Asti", "Avellino", "Bari", "Barletta-Andria-Trani", "Belluno", "Benevento", 
+    "Bergamo", "Biella", "Bologna", "Bolzano", "Brescia", "Brindisi", "Cagliari", 
+    "Caltanissetta", "Campobasso", "Caserta", "Catania", "Catanzaro", "Chieti", 
+    "Como", "Cosenza", "Cremona", "Crotone", "Cuneo", "Enna", "Fermo", "Ferrara", 
+    "Firenze", "Foggia", "Forlì-Cesena", "Frosinone", "Genova", "Gorizia", 
+    "Grosseto", "Imperia", "Isernia", "L'Aquila", "La Spezia", "Latina", "Lecce", 
+    "Lecco", "Livorno", "Lodi", "Lucca", "Macerata", "Mantova", "Massa-Carrara", 
+    "Matera", "Messina", "Milano", "Modena", "Monza e Brianza", "Napoli", "Novara", 
+    "Nuoro", "Oristano", "Padova", "Palermo", "Parma", "Pavia", "Perugia", 
+    "Pesaro e Urbino", "Pescara", "Piacenza", "Pisa", "Pistoia", "Pordenone", 
+    "Potenza", "Prato", "Ragusa", "Ravenna", "Reggio Calabria", "Reggio Emilia", 
+    "Rieti", "Rimini", "Roma", "Rovigo", "Salerno", "Sassari", "Savona", "Siena", 
+    "Siracusa", "Sondrio", "Sud Sardegna", "Taranto", "Teramo", "Terni", "Torino", 
+    "Trapani", "Trento", "Treviso", "Trieste", "Udine", "Varese", "Venezia", 
+    "Verbano-Cusio-Ossola", "Vercelli", "Verona", "Vibo Valentia", "Vicenza", 
+    "Viterbo"
+)
+
+# Stesse province in un frozenset, per le verifiche di appartenenza in validazione
+_PROVINCE_SET = frozenset(PROVINCE_LIST)
+
+
 def get_province_list():
     """
     Restituisce lista completa delle province italiane + Estero
     
     Returns:
-        list: Lista province
+        tuple: Province (costante di modulo, nessuna allocazione per chiamata)
     """
-    return [
-        "","Estero", "Agrigento", "Alessandria", "Ancona", "Aosta", "Arezzo", "Ascoli Piceno", 
-        "Asti", "Avellino", "Bari", "Barletta-Andria-Trani", "Belluno", "Benevento", 
-        "Bergamo", "Biella", "Bologna", "Bolzano", "Brescia", "Brindisi", "Cagliari", 
-        "Caltanissetta", "Campobasso", "Caserta", "Catania", "Catanzaro", "Chieti", 
-        "Como", "Cosenza", "Cremona", "Crotone", "Cuneo", "Enna", "Fermo", "Ferrara", 
-        "Firenze", "Foggia", "Forlì-Cesena", "Frosinone", "Genova", "Gorizia", 
-        "Grosseto", "Imperia", "Isernia", "L'Aquila", "La Spezia", "Latina", "Lecce", 
-        "Lecco", "Livorno", "Lodi", "Lucca", "Macerata", "Mantova", "Massa-Carrara", 
-        "Matera", "Messina", "Milano", "Modena", "Monza e Brianza", "Napoli", "Novara", 
-        "Nuoro", "Oristano", "Padova", "Palermo", "Parma", "Pavia", "Perugia", 
-        "Pesaro e Urbino", "Pescara", "Piacenza", "Pisa", "Pistoia", "Pordenone", 
-        "Potenza", "Prato", "Ragusa", "Ravenna", "Reggio Calabria", "Reggio Emilia", 
-        "Rieti", "Rimini", "Roma", "Rovigo", "Salerno", "Sassari", "Savona", "Siena", 
-        "Siracusa", "Sondrio", "Sud Sardegna", "Taranto", "Teramo", "Terni", "Torino", 
-        "Trapani", "Trento", "Treviso", "Trieste", "Udine", "Varese", "Venezia", 
-        "Verbano-Cusio-Ossola", "Vercelli", "Verona", "Vibo Valentia", "Vicenza", 
-        "Viterbo"
-    ]
+    return PROVINCE_LIST
+
+
+# Opzioni dei menu a tendina: tuple immutabili create una sola volta all'import
+QR_LOCATION_OPTIONS = (
+    "",
+    "Mezzi pubblici",
+    "Posto di lavoro", 
+    "Spazio pubblico",
+    "Cassetta della posta",
+    "Macchina",
+    "Università/Scuola",
+    "Bar/Ristorante",
+    "Centro commerciale",
+    "Centro sportivo",
+    "Altro"
+)
+
+AGE_RANGES = (
+    "",
+    "< 18",
+    "18-23", 
+    "24-29",
+    "30-35",
+    "36-40", 
+    "41-50",
+    "51-60",
+    "61-70",
+    "Over 71"
+)
+
+EDUCATION_LEVELS = (
+    "",
+    "Scuola media",
+    "Diploma superiore", 
+    "Laurea triennale",
+    "Laurea magistrale",
+    "Master/Dottorato"
+)
+
+GENDER_OPTIONS = ("", "Maschio", "Femmina", "Altro")
 
 
 def get_qr_location_options():
@@ -270,21 +605,9 @@ def get_qr_location_options():
     Restituisce lista opzioni dove è stato trovato il QR code
     
     Returns:
-        list: Lista opzioni QR location
+        tuple: Opzioni QR location (costante di modulo)
     """
-    return [
-        "",
-        "Mezzi pubblici",
-        "Posto di lavoro", 
-        "Spazio pubblico",
-        "Cassetta della posta",
-        "Macchina",
-        "Università/Scuola",
-        "Bar/Ristorante",
-        "Centro commerciale",
-        "Centro sportivo",
-        "Altro"
-    ]
+    return QR_LOCATION_OPTIONS
 
 
 def get_age_ranges():
@@ -292,20 +615,9 @@ def get_age_ranges():
     Restituisce lista fasce d'età
     
     Returns:
-        list: Lista fasce età
+        tuple: Fasce età (costante di modulo)
     """
-    return [
-        "",
-        "< 18",
-        "18-23", 
-        "24-29",
-        "30-35",
-        "36-40", 
-        "41-50",
-        "51-60",
-        "61-70",
-        "Over 71"
-    ]
+    return AGE_RANGES
 
 
 def get_education_levels():
@@ -313,16 +625,9 @@ def get_education_levels():
     Restituisce lista titoli di studio
     
     Returns:
-        list: Lista titoli studio
+        tuple: Titoli studio (costante di modulo)
     """
-    return [
-        "",
-        "Scuola media",
-        "Diploma superiore", 
-        "Laurea triennale",
-        "Laurea magistrale",
-        "Master/Dottorato"
-    ]
+    return EDUCATION_LEVELS
 
 
 def get_gender_options():
@@ -330,9 +635,19 @@ def get_gender_options():
     Restituisce opzioni genere
     
     Returns:
-        list: Lista opzioni genere
+        tuple: Opzioni genere (costante di modulo)
+    """
+    return GENDER_OPTIONS
+
+
+def _new_session_id():
+    """
+    Genera un ID di sessione univoco (prefisso leggibile con l'orario + uuid4)
+    
+    Returns:
+        str: ID sessione
     """
-    return ["", "Maschio", "Femmina", "Altro"]
+    return f"session_{datetime.now().strftime(_SESSION_ID_FORMAT)}_{uuid.uuid4().hex}"
 
 
 def initialize_session_state():
@@ -345,10 +660,30 @@ def initialize_session_state():
         st.session_state.user_data = {}
     if 'session_id' not in st.session_state:
         # Genera un ID unico per questa sessione
-        st.session_state.session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash(str(datetime.now()))}"
+        st.session_state.session_id = _new_session_id()
         st.session_state.user_data['session_id'] = st.session_state.session_id
 
 
+# Valori degli header che indicano una richiesta senza browser (health check)
+_EMPTY_HEADER_VALUES = frozenset({'N/A', '', None})
+_EMPTY_USER_AGENTS = _EMPTY_HEADER_VALUES | {'Unknown'}
+
+
+def _request_headers():
+    """
+    Copia una sola volta per sessione gli header della richiesta usati dall'app
+    
+    Returns:
+        dict: Header presenti tra user-agent, host e referer
+    """
+    if '_request_headers' not in st.session_state:
+        headers = st.context.headers
+        st.session_state._request_headers = {
+            name: headers[name] for name in ('user-agent', 'host', 'referer') if name in headers
+        }
+    return st.session_state._request_headers
+
+
 def is_health_check():
     """
     FILTRO DEFINITIVO - Rileva health check automatici basato sui dati reali raccolti
@@ -363,18 +698,19 @@ def is_health_check():
     """
     try:
         # Ottieni header dalla richiesta
-        user_agent = st.context.headers.get('user-agent', '')
-        host = st.context.headers.get('host', '')
-        referer = st.context.headers.get('referer', '')
+        headers = _request_headers()
+        user_agent = headers.get('user-agent', '')
+        host = headers.get('host', '')
+        referer = headers.get('referer', '')
         
         # PATTERN ESATTO degli health check automatici
         if user_agent == 'Unknown':
             return True
             
         # Backup: se tutti gli header sono N/A o vuoti
-        if (user_agent in ['Unknown', 'N/A', '', None] and 
-            host in ['N/A', '', None] and 
-            referer in ['N/A', '', None]):
+        if (user_agent in _EMPTY_USER_AGENTS and 
+            host in _EMPTY_HEADER_VALUES and 
+            referer in _EMPTY_HEADER_VALUES):
             return True
             
         return False
@@ -388,25 +724,28 @@ def should_track_visit():
     """
     VERSIONE FINALE - Filtra health check basato sui dati reali
     
+    Gli header non cambiano durante la sessione: l'esito viene calcolato
+    una sola volta e conservato in session_state.
+    
     Returns:
         bool: True se dovrebbe essere tracciata, False se è health check
     """
-    # Se è un health check automatico, NON tracciare
-    if is_health_check():
-        return False
+    if '_should_track' not in st.session_state:
+        # Se è un health check automatico, NON tracciare; altrimenti traccia la visita
+        st.session_state._should_track = not is_health_check()
         
-    # Altrimenti, traccia la visita
-    return True
+    return st.session_state._should_track
 
 
 def show_debug_final():
     """
     DEBUG FINALE - mostra se il filtro funziona
     """
-    if os.getenv("DEBUG_MODE", "").lower() == "true":
-        user_agent = st.context.headers.get('user-agent', 'N/A')
-        host = st.context.headers.get('host', 'N/A')
-        referer = st.context.headers.get('referer', 'N/A')
+    if _DEBUG:
+        headers = _request_headers()
+        user_agent = headers.get('user-agent', 'N/A')
+        host = headers.get('host', 'N/A')
+        referer = headers.get('referer', 'N/A')
         
         is_hc = is_health_check()
         should_track = should_track_visit()
@@ -433,6 +772,12 @@ def track_page_opening():
     Returns:
         bool: True se è la prima apertura tracciata, False se già tracciata o health check
     """
+    # Già tracciata: nessun lavoro (né debug né scrittura) nei rerun successivi.
+    # Conta la presenza del flag, non il valore: dopo reset_session (che lo pone
+    # a False) la demo ricominciata non registra una nuova apertura pagina
+    if 'page_tracked' in st.session_state:
+        return False
+    
     # Debug finale solo se abilitato
     show_debug_final()
     
@@ -440,23 +785,18 @@ def track_page_opening():
     if not should_track_visit():
         return False  # ❌ Health check - NON tracciare
         
-    if 'page_tracked' not in st.session_state:
-        st.session_state.page_tracked = True
-        st.session_state.user_data.update({
-            'page_open_timestamp': datetime.now().isoformat(),
-            'status': 'page_opened',
-            'user_agent': st.context.headers.get('user-agent', 'Unknown'),
-            'session_id': st.session_state.session_id
-        })
-        
-        # Salva solo se è un utente reale
-        sheet = setup_google_sheets()
-        if sheet:
-            save_to_google_sheets_fixed(st.session_state.user_data, sheet)
-        
-        return True
+    st.session_state.page_tracked = True
+    st.session_state.user_data.update({
+        'page_open_timestamp': datetime.now().isoformat(timespec='seconds'),
+        'status': 'page_opened',
+        'user_agent': _request_headers().get('user-agent', 'Unknown'),
+        'session_id': st.session_state.session_id
+    })
+    
+    # Salva solo se è un utente reale (il sheet viene aperto dal thread di scrittura)
+    queue_sheet_write(st.session_state.user_data)
     
-    return False
+    return True
 
 
 def create_progress_bar(step_number, total_steps=3):
@@ -472,6 +812,39 @@ def create_progress_bar(step_number, total_steps=3):
     st.write(f"Progresso: {int(progress*100)}%")
 
 
+def _validate_step_1(qr_location=None, consent=None, **_):
+    """Valida consenso e posizione del QR code (step 1)"""
+    if not consent:
+        return False, "Devi accettare il trattamento dati per continuare"
+    if not qr_location:
+        return False, "Indica dove hai trovato il QR code per continuare"
+    return True, ""
+
+
+def _validate_step_2(age_range=None, gender=None, birth_province=None, education=None, **_):
+    """Valida i dati personali (step 2)"""
+    if not all((age_range, gender, birth_province, education)):
+        return False, "Completa tutti i campi per continuare"
+    if birth_province not in _PROVINCE_SET:
+        return False, "Seleziona una provincia valida dall'elenco"
+    return True, ""
+
+
+def _validate_step_3(email_input=None, **_):
+    """Valida l'email richiesta (step 3)"""
+    if not email_input:
+        return False, "Inserisci la tua email per ricevere il buono Amazon"
+    return True, ""
+
+
+# Validatore di ogni step (gli step non elencati sono sempre validi)
+_STEP_VALIDATORS = {
+    1: _validate_step_1,
+    2: _validate_step_2,
+    3: _validate_step_3
+}
+
+
 def validate_step_data(step, age_range=None, gender=None, birth_province=None, 
                       education=None, qr_location=None, 
                       consent=None, email_input=None):
@@ -485,43 +858,33 @@ def validate_step_data(step, age_range=None, gender=None, birth_province=None,
     Returns:
         tuple: (is_valid, error_message)
     """
-    if step == 1:
-        if not consent:
-            return False, "Devi accettare il trattamento dati per continuare"
-        if not qr_location:
-            return False, "Indica dove hai trovato il QR code per continuare"
-        return True, ""
-    
-    elif step == 2:
-        if not age_range or not gender or not birth_province or not education:
-            return False, "Completa tutti i campi per continuare"
+    validator = _STEP_VALIDATORS.get(step)
+    if validator is None:
         return True, ""
     
-    elif step == 3:
-        if not email_input:
-            return False, "Inserisci la tua email per ricevere il buono Amazon"
-        return True, ""
-    
-    return True, ""
+    return validator(
+        age_range=age_range, gender=gender, birth_province=birth_province,
+        education=education, qr_location=qr_location,
+        consent=consent, email_input=email_input
+    )
 
 
-def save_step_data(step, sheet, **kwargs):
+def save_step_data(step, **kwargs):
     """
     VERSIONE FINALE con filtro health check
     
     Args:
         step (int): Numero step
-        sheet: Google Sheet object  
         **kwargs: Dati da salvare
         
     Returns:
-        bool: True se salvato correttamente
+        bool: True se i dati sono stati registrati (il salvataggio avviene in background)
     """
     # FILTRO HEALTH CHECK
     if not should_track_visit():
         return True  # Ritorna True per non bloccare l'UI, ma non salva nulla
         
-    timestamp = datetime.now().isoformat()
+    timestamp = datetime.now().isoformat(timespec='seconds')
     
     if step == 1:
         st.session_state.user_data.update({
@@ -547,13 +910,16 @@ def save_step_data(step, sheet, **kwargs):
             'completed': True
         })
     
-    # Salva solo se NON è health check
-    if sheet:
-        return save_to_google_sheets_fixed(st.session_state.user_data, sheet)
+    # Salva solo se NON è health check (scrittura in background, l'esito non blocca l'UI)
+    queue_sheet_write(st.session_state.user_data)
     
     return True
 
 
+# Campi del report scaricabile copiati così come sono (vuoti se mancanti)
+_DOWNLOAD_KEYS = ('qr_location', 'age_range', 'gender', 'birth_province', 'education', 'status')
+
+
 def create_data_download(user_data):
     """
     Crea file JSON scaricabile con i dati utente
@@ -566,19 +932,26 @@ def create_data_download(user_data):
     """
     download_data = {
         'session_id': user_data.get('session_id', 'unknown'),
-        'completion_timestamp': user_data.get('completion_timestamp', datetime.now().isoformat()),
-        'qr_location': user_data.get('qr_location', ''),
-        'age_range': user_data.get('age_range', ''),
-        'gender': user_data.get('gender', ''),
-        'birth_province': user_data.get('birth_province', ''),
-        'education': user_data.get('education', ''),
-        'status': user_data.get('status', ''),
+        'completion_timestamp': user_data.get('completion_timestamp') or datetime.now().isoformat(timespec='seconds'),
+        **{key: user_data.get(key, '') for key in _DOWNLOAD_KEYS},
         'note': 'Dati raccolti per progetto educativo cybersecurity - Email NON salvata'
     }
     
     return json.dumps(download_data, indent=2, ensure_ascii=False)
 
 
+# Righe della tabella dei dati raccolti: (etichetta, chiave in user_data)
+_COLLECTED_FIELDS = (
+    ("🆔 ID Sessione", 'session_id'),
+    ("⏱️ Apertura pagina", 'page_open_timestamp'),
+    ("Dove trovato QR Code", 'qr_location'),
+    ("Fascia d'età", 'age_range'),
+    ("Sesso", 'gender'),
+    ("Provincia di nascita", 'birth_province'),
+    ("Titolo di studio", 'education')
+)
+
+
 def display_collected_data(user_data):
     """
     Mostra i dati raccolti in formato tabella
@@ -587,20 +960,11 @@ def display_collected_data(user_data):
         user_data (dict): Dati da visualizzare
         
     Returns:
-        pandas.DataFrame: DataFrame per visualizzazione
+        list: Righe della tabella (dict Campo/Valore), senza costruire un DataFrame
     """
-    data_df = pd.DataFrame([
-        ["🆔 ID Sessione", user_data.get('session_id', '')],
-        ["⏱️ Apertura pagina", user_data.get('page_open_timestamp', '')],
-        ["Dove trovato QR Code", user_data.get('qr_location', '')],
-        ["Fascia d'età", user_data.get('age_range', '')],
-        ["Sesso", user_data.get('gender', '')],
-        ["Provincia di nascita", user_data.get('birth_province', '')],
-        ["Titolo di studio", user_data.get('education', '')],
-        ["⚠️ Email", "SÌ (avresti dato anche quella!)"]
-    ], columns=["Campo", "Valore"])
-    
-    return data_df
+    rows = [{"Campo": campo, "Valore": user_data.get(key, '')} for campo, key in _COLLECTED_FIELDS]
+    rows.append({"Campo": "⚠️ Email", "Valore": "SÌ (avresti dato anche quella!)"})
+    return rows
 
 
 def reset_session():
@@ -611,16 +975,31 @@ def reset_session():
     st.session_state.user_data = {}
     st.session_state.page_tracked = False
     
+    # Scarta i contenuti dello step 4 calcolati per la sessione precedente
+    for key in ('report_json', 'report_filename', 'collected_data_rows'):
+        st.session_state.pop(key, None)
+    
     # Genera nuovo session ID
-    st.session_state.session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash(str(datetime.now()))}"
+    st.session_state.session_id = _new_session_id()
     st.session_state.user_data['session_id'] = st.session_state.session_id
 
 
-def load_custom_css():
+def _minify_css(css):
     """
-    Carica CSS personalizzato per migliorare l'aspetto dell'app
+    Compatta un foglio di stile rimuovendo spazi e a capo superflui
+    
+    Args:
+        css (str): Blocco <style> leggibile
+        
+    Returns:
+        str: Stesso blocco su una riga, senza spazi attorno a { } ; :
     """
-    st.markdown("""
+    return re.sub(r'\s*([{};:])\s*', r'\1', re.sub(r'\s+', ' ', css)).strip()
+
+
+# Fogli di stile dell'app, costruiti (e compattati) una sola volta all'import del modulo
+# Stili comuni a tutti gli step
+_BASE_CSS = _minify_css("""
     <style>
         .main-header {
             text-align: center;
@@ -642,6 +1021,22 @@ def load_custom_css():
             margin: 1rem 0;
         }
         
+        .logo {
+            background: #ff9900;
+            color: white;
+            padding: 1rem 2rem;
+            border-radius: 8px;
+            font-weight: bold;
+            text-align: center;
+            margin: 1rem auto;
+            width: fit-content;
+        }
+    </style>
+    """)
+
+# Stili usati solo dal disclaimer finale (step 4)
+_DISCLAIMER_CSS = _minify_css("""
+    <style>
         .warning-box {
             background: #ff4444;
             color: white;
@@ -658,16 +1053,22 @@ def load_custom_css():
             margin: 1rem 0;
             border-left: 4px solid #ff4444;
         }
-        
-        .logo {
-            background: #ff9900;
-            color: white;
-            padding: 1rem 2rem;
-            border-radius: 8px;
-            font-weight: bold;
-            text-align: center;
-            margin: 1rem auto;
-            width: fit-content;
-        }
     </style>
-    """, unsafe_allow_html=True)
+    """)
+
+
+def load_base_css():
+    """
+    Carica il CSS comune a tutti gli step
+    
+    Il foglio di stile è una costante di modulo; va comunque emesso a ogni rerun
+    perché Streamlit rimuove gli elementi non ridisegnati.
+    """
+    st.markdown(_BASE_CSS, unsafe_allow_html=True)
+
+
+def load_disclaimer_css():
+    """
+    Carica il CSS del disclaimer finale, solo quando viene mostrato lo step 4
+    """
+    st.markdown(_DISCLAIMER_CSS, unsafe_allow_html=True)